@@ -0,0 +1,270 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import degrees
+from util import (Node, StackFrontier, QueueFrontier,
+                  DequeStackFrontier, DequeQueueFrontier)
+
+
+def compare_searches(pairs):
+    """
+    Runs breadth-first and bidirectional search on each (source, target)
+    pair and returns the total nodes expanded and seconds taken by each.
+    """
+    totals = {
+        "bfs": {"nodes": 0, "seconds": 0},
+        "bidirectional": {"nodes": 0, "seconds": 0}
+    }
+    searches = [
+        ("bfs", degrees.shortest_path),
+        ("bidirectional", degrees.bidirectional_path)
+    ]
+    for source, target in pairs:
+        lengths = set()
+        for name, search in searches:
+            start = time.perf_counter()
+            path = search(source, target)
+            totals[name]["seconds"] += time.perf_counter() - start
+            totals[name]["nodes"] += degrees.nodes_expanded
+            lengths.add(None if path is None else len(path))
+        if len(lengths) != 1:
+            raise Exception(f"searches disagree on {source} -> {target}")
+    return totals
+
+
+def frontier_throughput(frontier_class, n):
+    """
+    Adds n nodes to a frontier, checking membership before each add,
+    then removes them all. Returns operations per second.
+    """
+    frontier = frontier_class()
+    start = time.perf_counter()
+    for state in range(n):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+    while not frontier.empty():
+        frontier.remove()
+    return 3 * n / (time.perf_counter() - start)
+
+
+def benchmark_frontiers(args):
+    """
+    Prints the throughput of each frontier implementation.
+    The list-backed frontiers are quadratic, so they are measured
+    on a smaller number of nodes.
+    """
+    frontiers = [
+        (StackFrontier, min(args.nodes, args.list_nodes)),
+        (QueueFrontier, min(args.nodes, args.list_nodes)),
+        (DequeStackFrontier, args.nodes),
+        (DequeQueueFrontier, args.nodes)
+    ]
+    print(f"{'frontier':<22}{'nodes':>10}{'ops/second':>14}")
+    for frontier_class, n in frontiers:
+        ops = frontier_throughput(frontier_class, n)
+        print(f"{frontier_class.__name__:<22}{n:>10}{ops:>14.0f}")
+
+
+def benchmark_searches(args):
+    """
+    Prints nodes expanded and wall time of each search on random pairs.
+    """
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    rng = random.Random(args.seed)
+    person_ids = list(degrees.people)
+    pairs = [
+        (rng.choice(person_ids), rng.choice(person_ids))
+        for _ in range(args.pairs)
+    ]
+
+    totals = compare_searches(pairs)
+    print(f"{'search':<15}{'nodes expanded':>16}{'seconds':>12}")
+    for name, total in totals.items():
+        print(f"{name:<15}{total['nodes']:>16}{total['seconds']:>12.3f}")
+
+
+def benchmark_graph(args):
+    """
+    Prints the time and memory taken to build the graph from the CSV
+    files, the time taken to load the snapshot saved by that build,
+    and the mean latency of a breadth-first query on it.
+
+    A loaded snapshot's pages are memory-mapped, which tracemalloc does
+    not see, so memory is measured on the freshly built graph instead.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    degrees.load_data(args.directory, rebuild_cache=True)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Built from CSV in {seconds:.2f}s, holding "
+          f"{current / 2 ** 20:.1f} MiB ({peak / 2 ** 20:.1f} MiB peak) "
+          f"of Python allocations, as traced by tracemalloc.")
+
+    start = time.perf_counter()
+    degrees.load_data(args.directory)
+    seconds = time.perf_counter() - start
+    print(f"Loaded snapshot in {seconds:.3f}s (memory-mapped, so its "
+          f"pages are shared with the page cache and not traced).")
+
+    rng = random.Random(args.seed)
+    person_ids = list(degrees.people)
+    start = time.perf_counter()
+    for _ in range(args.pairs):
+        degrees.shortest_path(rng.choice(person_ids), rng.choice(person_ids))
+    seconds = (time.perf_counter() - start) / args.pairs
+    print(f"Mean query latency: {seconds * 1000:.2f} ms.")
+
+
+def misspell(name, rng):
+    """
+    Returns name with one random letter deleted, swapped with the next,
+    replaced or inserted, in a word long enough to be matched anyway.
+    """
+    words = name.split()
+    long_words = [i for i, word in enumerate(words) if len(word) > 2]
+    if not long_words:
+        return name
+    i = rng.choice(long_words)
+    word = words[i]
+    j = rng.randrange(len(word) - 1)
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    words[i] = rng.choice([
+        word[:j] + word[j + 1:],
+        word[:j] + word[j + 1] + word[j] + word[j + 2:],
+        word[:j] + letter + word[j + 1:],
+        word[:j] + letter + word[j:]
+    ])
+    return " ".join(words)
+
+
+def benchmark_names(args):
+    """
+    Prints the mean and 99th percentile latency of matching each word of
+    a name query against the vocabulary, and of the whole name search,
+    on the names of random people, some of them misspelled.
+    """
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    graph = degrees.graph
+    index = graph.name_index
+    rng = random.Random(args.seed)
+    queries = []
+    for _ in range(args.queries):
+        name = graph.names[rng.randrange(graph.num_people())].lower()
+        queries.append(misspell(name, rng) if rng.random() < args.typos
+                       else name)
+
+    def words(query):
+        words = query.split()
+        for i, word in enumerate(words):
+            index.match_word(word, prefix=(i == len(words) - 1))
+
+    print(f"{len(index.words)} words in the vocabulary, "
+          f"{len(queries)} queries.")
+    print(f"{'stage':<8}{'mean ms':>10}{'p99 ms':>10}")
+    for stage, run in [("words", words), ("search", index.search)]:
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            run(query)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        mean = sum(latencies) / len(latencies)
+        p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+        print(f"{stage:<8}{mean * 1000:>10.3f}{p99 * 1000:>10.3f}")
+
+
+def benchmark_tree_cache(args):
+    """
+    Prints the time taken to answer queries between a few hub people
+    and random targets, with and without the BFS tree cache.
+    """
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    rng = random.Random(args.seed)
+    person_ids = list(degrees.people)
+    hubs = rng.sample(person_ids, args.hubs)
+    pairs = []
+    for _ in range(args.pairs):
+        pair = (rng.choice(hubs), rng.choice(person_ids))
+        pairs.append(pair if rng.random() < 0.5 else pair[::-1])
+
+    for size in [0, args.hubs]:
+        degrees.use_tree_cache(size)
+        start = time.perf_counter()
+        for source, target in pairs:
+            degrees.shortest_path(source, target)
+        seconds = time.perf_counter() - start
+        if size:
+            cache = degrees.tree_cache
+            print(f"Tree cache of {size}: {seconds:.3f}s "
+                  f"({cache.hits} hits, {cache.misses} misses)")
+        else:
+            print(f"No tree cache: {seconds:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    searches = commands.add_parser(
+        "search", help="compare BFS and bidirectional search on random pairs"
+    )
+    searches.add_argument("directory", nargs="?", default="large")
+    searches.add_argument("--pairs", type=int, default=100)
+    searches.add_argument("--seed", type=int, default=0)
+    searches.set_defaults(run=benchmark_searches)
+
+    frontiers = commands.add_parser(
+        "frontiers", help="measure frontier add/contains/remove throughput"
+    )
+    frontiers.add_argument("--nodes", type=int, default=10 ** 6)
+    frontiers.add_argument("--list-nodes", type=int, default=10 ** 4)
+    frontiers.set_defaults(run=benchmark_frontiers)
+
+    graph = commands.add_parser(
+        "graph",
+        help="measure graph build memory, snapshot load time "
+             "and breadth-first query latency"
+    )
+    graph.add_argument("directory", nargs="?", default="large")
+    graph.add_argument("--pairs", type=int, default=100)
+    graph.add_argument("--seed", type=int, default=0)
+    graph.set_defaults(run=benchmark_graph)
+
+    names = commands.add_parser(
+        "names", help="measure name lookup latency on random people's names"
+    )
+    names.add_argument("directory", nargs="?", default="large")
+    names.add_argument("--queries", type=int, default=1000)
+    names.add_argument("--typos", type=float, default=0.5,
+                       help="fraction of queries misspelled")
+    names.add_argument("--seed", type=int, default=0)
+    names.set_defaults(run=benchmark_names)
+
+    tree_cache = commands.add_parser(
+        "tree-cache", help="compare hub queries with and without the tree cache"
+    )
+    tree_cache.add_argument("directory", nargs="?", default="large")
+    tree_cache.add_argument("--pairs", type=int, default=1000)
+    tree_cache.add_argument("--hubs", type=int, default=8)
+    tree_cache.add_argument("--seed", type=int, default=0)
+    tree_cache.set_defaults(run=benchmark_tree_cache)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
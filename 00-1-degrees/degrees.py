@@ -1,7 +1,14 @@
-import csv
+import argparse
+import itertools
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from eccentricity import load_table
+from graph import MoviesView, NamesView, PeopleView
+from snapshot import cached_graph
+from treecache import TreeCache
+
+# Integer-indexed CSR graph of people and movies
+graph = None
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,54 +19,57 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Optional cache of BFS trees from frequently queried people
+tree_cache = None
+
+# Number of people whose neighbors were expanded by the most recent search
+nodes_expanded = 0
 
-def load_data(directory):
-    """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+
+def load_data(directory, rebuild_cache=False):
+    """
+    Load data from CSV files into memory, or from the binary
+    snapshot of them saved by an earlier run.
+    """
+    global graph, names, people, movies, tree_cache
+    graph = cached_graph(directory, rebuild=rebuild_cache)
+    names = NamesView(graph)
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
+    tree_cache = None
+
+
+def use_tree_cache(size):
+    """
+    Answers shortest_path queries from a cache of up to `size`
+    BFS trees, or stops caching if `size` is 0.
+    """
+    global tree_cache
+    tree_cache = TreeCache(graph, size) if size else None
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people and meet in the middle")
+    parser.add_argument("--rebuild-cache", action="store_true",
+                        help="reload the CSV files and rebuild the snapshot")
+    parser.add_argument("--tree-cache", type=int, default=0, metavar="SIZE",
+                        help="cache BFS trees from up to SIZE people")
+    parser.add_argument("--paths", type=int, default=1, metavar="K",
+                        help="count the shortest paths and print up to K")
+    parser.add_argument("--eccentricity", action="store_true",
+                        help="print both people's eccentricities from the "
+                             "table precomputed by eccentricity.py")
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory, rebuild_cache=args.rebuild_cache)
+    use_tree_cache(args.tree_cache)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,13 +79,33 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.eccentricity:
+        table = load_table(args.directory)
+        if table is None:
+            sys.exit("No up to date eccentricity table, "
+                     "run eccentricity.py first.")
+        for person_id in [source, target]:
+            print(f"{people[person_id]['name']}: "
+                  f"{describe_eccentricity(table, person_id)}")
+
+    if args.paths > 1:
+        count, paths = shortest_paths(source, target, args.paths)
+    elif args.bidirectional:
+        paths = [bidirectional_path(source, target)]
+    else:
+        paths = [shortest_path(source, target)]
 
-    if path is None:
+    if not paths or paths[0] is None:
         print("Not connected.")
-    else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
+        return
+
+    degrees = len(paths[0])
+    print(f"{degrees} degrees of separation.")
+    if args.paths > 1:
+        print(f"{count} shortest paths, showing {len(paths)}.")
+    for number, path in enumerate(paths, 1):
+        if len(paths) > 1:
+            print(f"Path {number}:")
         path = [(None, source)] + path
         for i in range(degrees):
             person1 = people[path[i][1]]["name"]
@@ -84,6 +114,20 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
+def describe_eccentricity(table, person_id):
+    """
+    Returns a description of how far from a person everyone they are
+    connected to lies, according to an EccentricityTable.
+    """
+    lower, upper = table.bounds(graph.person_index(person_id))
+    if lower == upper:
+        return f"everyone connected is within {lower} degrees"
+    if upper is None:
+        return f"someone connected is at least {lower} degrees away"
+    return (f"everyone connected is within {upper} degrees, "
+            f"and someone at least {lower}")
+
+
 def shortest_path(source, target):
     """
     Returns the shortest list of (movie_id, person_id) pairs
@@ -91,62 +135,108 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
-    frontier = QueueFrontier()
-    start_node = Node(state=source, parent=None, action=None)
-    frontier.add(start_node)
-
-    # Keep track of visited people to avoid cycles
-    visited = set()
-    visited.add(source)
-
-    while not frontier.empty():
-        # Dequeue the next node
-        node = frontier.remove()
-
-        # If we've reached the target, reconstruct the path
-        if node.state == target:
-            path = []
-            while node.parent is not None:
-                path.append((node.action, node.state))  # (movie_id, person_id)
-                node = node.parent
-            path.reverse()  # Reverse the path since we've constructed it backwards
-            return path
-
-        # Explore neighbors of the current node
-        for movie_id, neighbor in neighbors_for_person(node.state):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                # Add the neighbor to the frontier with the updated path
-                child_node = Node(state=neighbor, parent=node, action=movie_id)
-                frontier.add(child_node)
-    return None
-    raise NotImplementedError
+    if tree_cache is not None:
+        return search(tree_cache.shortest_path, source, target)
+    return search(graph.shortest_path, source, target)
+
+
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both people at once until the two searches meet.
+
+    If no possible path, returns None.
+    """
+    return search(graph.bidirectional_path, source, target)
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns the number of distinct shortest paths between the source
+    and the target, counting paths through different movies separately.
+    """
+    return shortest_paths(source, target, 0)[0]
+
+
+def all_shortest_paths(source, target):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connects the source to the target.
+    """
+    paths = graph.all_shortest_paths(
+        graph.person_index(source), graph.person_index(target)
+    )
+    for path in paths:
+        yield graph.path_ids(path)
+
+
+def k_shortest_paths(source, target, k):
+    """
+    Returns up to k of the shortest lists of (movie_id, person_id) pairs
+    that connect the source to the target.
+    """
+    return list(itertools.islice(all_shortest_paths(source, target), k))
+
+
+def shortest_paths(source, target, k):
+    """
+    Returns the number of shortest paths between the source and the
+    target, and up to k of them as lists of (movie_id, person_id) pairs,
+    from a single breadth-first search.
+    """
+    s, t = graph.person_index(source), graph.person_index(target)
+    distance = graph.distances(s, t)
+    if distance is None:
+        return 0, []
+    count = graph.count_shortest_paths(s, t, distance)
+    paths = itertools.islice(graph.all_shortest_paths(s, t, distance), k)
+    return count, [graph.path_ids(path) for path in paths]
+
+
+def search(method, source, target):
+    """
+    Runs a graph search method between two person_ids and converts
+    the resulting path back to (movie_id, person_id) pairs.
+    """
+    global nodes_expanded
+    path = method(graph.person_index(source), graph.person_index(target))
+    nodes_expanded = graph.nodes_expanded
+    if path is None:
+        return None
+    return graph.path_ids(path)
 
 
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
-    resolving ambiguities as needed.
+    resolving ambiguities and misspellings as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
-        return None
-    elif len(person_ids) > 1:
+    matches = graph.people_named(name)
+    if len(matches) == 1:
+        return graph.person_ids[matches[0]]
+    elif len(matches) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+        matches.sort(key=lambda p: -graph.name_index.movie_count(p))
     else:
-        return person_ids[0]
+        matches = graph.name_index.search(name)
+        if len(matches) == 0:
+            return None
+        print(f"No one named '{name}'. Did you mean:")
+
+    person_ids = [graph.person_ids[p] for p in matches]
+    for p, person_id in zip(matches, person_ids):
+        person = people[person_id]
+        count = graph.name_index.movie_count(p)
+        print(f"ID: {person_id}, Name: {person['name']}, "
+              f"Birth: {person['birth']}, Movies: {count}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
 
 
 def neighbors_for_person(person_id):
@@ -154,12 +244,11 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    p = graph.person_index(person_id)
+    return {
+        (graph.movie_ids[m], graph.person_ids[q])
+        for m, q in graph.neighbors(p)
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,383 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from snapshot import cached_graph, read_sections, source_stats, write_sections
+
+# Identifies eccentricity tables, and changes whenever the layout does
+MAGIC = b"DEGECC01"
+
+# Table file name, kept alongside the CSV files it was computed from
+TABLE = "eccentricity.table"
+
+# Stored in place of a distance that is not known
+UNKNOWN = 255
+
+# Integer-indexed CSR graph of people and movies
+graph = None
+
+
+def init_worker(directory):
+    """
+    Loads the graph in a worker process, unless it was inherited
+    already loaded from the parent.
+    """
+    global graph
+    if graph is None:
+        graph = cached_graph(directory)
+
+
+def column_counts(values, width):
+    """
+    Returns, for each of the low width bits, how many of the integers
+    in values have that bit set.
+
+    The integers are summed as bit-sliced binary counters, so each
+    addition costs a few whole-integer operations rather than one
+    operation per bit.
+    """
+    slices = []
+    for x in values:
+        i = 0
+        while x:
+            if i == len(slices):
+                slices.append(0)
+            carry = slices[i] & x
+            slices[i] ^= x
+            x = carry
+            i += 1
+    return [
+        sum(((s >> j) & 1) << i for i, s in enumerate(slices))
+        for j in range(width)
+    ]
+
+
+def sweep(sources):
+    """
+    Runs a breadth-first search from every person in sources at once,
+    tracking which searches have reached each person as the bits of
+    an integer, so one pass over the graph advances them all.
+
+    Returns a list of (eccentricity, people reached, total distance)
+    for each source, the number of (source, person) pairs at each
+    distance, and a bytearray of each person's greatest distance from
+    any of the sources.
+    """
+    width = len(sources)
+    seen = [0] * graph.num_people()
+    seen_movies = [0] * graph.num_movies()
+    farthest = bytearray(graph.num_people())
+    frontier = {}
+    for i, s in enumerate(sources):
+        frontier[s] = frontier.get(s, 0) | 1 << i
+    for s, bits in frontier.items():
+        seen[s] = bits
+
+    stats = [[0, 0, 0] for _ in sources]
+    histogram = [width]
+    depth = 0
+    while frontier:
+        depth += 1
+        if depth == UNKNOWN:
+            raise OverflowError("path too long to track")
+
+        # Gather the searches arriving at each movie, so that its stars
+        # are visited once per layer however many searches arrive
+        arriving = {}
+        for p, bits in frontier.items():
+            for m in graph.movies_of(p):
+                arriving[m] = arriving.get(m, 0) | bits
+        next_frontier = {}
+        for m, bits in arriving.items():
+            bits &= ~seen_movies[m]
+            if not bits:
+                continue
+            seen_movies[m] |= bits
+            for q in graph.stars_of(m):
+                new = bits & ~seen[q]
+                if new:
+                    next_frontier[q] = next_frontier.get(q, 0) | new
+        for q, new in next_frontier.items():
+            seen[q] |= new
+            farthest[q] = depth
+
+        counts = column_counts(next_frontier.values(), width)
+        for i, count in enumerate(counts):
+            if count:
+                stats[i][0] = depth
+                stats[i][1] += count
+                stats[i][2] += depth * count
+        if next_frontier:
+            histogram.append(sum(counts))
+        frontier = next_frontier
+
+    return [tuple(s) for s in stats], histogram, farthest
+
+
+class Estimate():
+    """
+    Running totals of the sweeps from sampled sources.
+
+    The average separation is the mean, over sampled people who reach
+    anyone, of their mean distance to the people they reach. Each such
+    mean lies between 1 and the largest eccentricity, so by Hoeffding's
+    inequality the average of k of them is within
+    (largest - 1) * sqrt(ln(2 / (1 - confidence)) / (2 * k))
+    of its expectation with the given confidence.
+    """
+
+    def __init__(self, num_people):
+        self.sources = 0
+        self.connected = 0
+        self.total = 0
+        self.largest = 0
+        self.histogram = []
+
+        # Maps each sampled source to its (eccentricity, people reached)
+        self.sampled = {}
+        self.lower = bytearray(num_people)
+
+    def add(self, sources, stats, histogram, farthest):
+        for s, (eccentricity, reached, distance) in zip(sources, stats):
+            self.sources += 1
+            self.sampled[s] = (eccentricity, reached)
+            self.largest = max(self.largest, eccentricity)
+            if reached:
+                self.connected += 1
+                self.total += distance / reached
+        for d, count in enumerate(histogram):
+            if d == len(self.histogram):
+                self.histogram.append(0)
+            self.histogram[d] += count
+
+        # Nobody is closer to their farthest person than to these sources
+        self.lower = bytearray(map(max, self.lower, farthest))
+
+    def mean(self):
+        return self.total / self.connected if self.connected else 0
+
+    def half_width(self, confidence):
+        """
+        Returns the Hoeffding bound on the error of the mean.
+        """
+        if not self.connected:
+            return math.inf
+        return (max(self.largest - 1, 0)
+                * math.sqrt(math.log(2 / (1 - confidence))
+                            / (2 * self.connected)))
+
+
+def samples_needed(largest, epsilon, confidence):
+    """
+    Returns how many connected sources bound the mean within epsilon,
+    given the largest eccentricity seen so far.
+    """
+    spread = max(largest - 1, 0)
+    return math.ceil(spread ** 2 * math.log(2 / (1 - confidence))
+                     / (2 * epsilon ** 2))
+
+
+def batches(people, size):
+    return [people[i:i + size] for i in range(0, len(people), size)]
+
+
+def compute(directory, epsilon=0.05, confidence=0.95, exact=False,
+            batch=128, max_sources=10000, workers=None, seed=None):
+    """
+    Runs the sweeps for a data directory and returns the Estimate,
+    the exact eccentricity bounds for every person as a pair of
+    bytearrays, and whether the run was exhaustive.
+
+    Unless exact is True, sources are sampled in rounds until the
+    average separation is within epsilon with the given confidence,
+    or max_sources have been swept.
+    """
+    n = graph.num_people()
+    if exact:
+        order = list(range(n))
+    else:
+        order = random.Random(seed).sample(range(n), min(n, max_sources))
+    estimate = Estimate(n)
+
+    workers = workers or os.cpu_count()
+    with multiprocessing.Pool(workers, initializer=init_worker,
+                              initargs=(directory,)) as pool:
+        position = 0
+
+        # A first round of one batch per worker estimates the spread,
+        # which fixes how many sources the bound needs
+        wanted = len(order) if exact else min(len(order), batch * workers)
+        while position < len(order):
+            work = batches(order[position:wanted], batch)
+            position = wanted
+            for sources, (stats, histogram, farthest) in zip(
+                work, pool.imap(sweep, work)
+            ):
+                estimate.add(sources, stats, histogram, farthest)
+            print(f"\r{estimate.sources} sources swept", end="",
+                  file=sys.stderr)
+            if exact:
+                continue
+            if estimate.half_width(confidence) <= epsilon:
+                break
+            needed = samples_needed(estimate.largest, epsilon, confidence)
+            ratio = estimate.sources / max(estimate.connected, 1)
+            wanted = min(len(order), max(
+                position + batch,
+                math.ceil(needed * ratio)
+            ))
+        print(file=sys.stderr)
+
+    exhaustive = estimate.sources == n
+    lower = estimate.lower
+    if exhaustive:
+        upper = bytearray(lower)
+    else:
+        upper = upper_bounds(estimate)
+    return estimate, lower, upper, exhaustive
+
+
+def upper_bounds(estimate):
+    """
+    Returns a bytearray bounding every person's eccentricity from above
+    by their distance to a sampled center plus the center's eccentricity,
+    with UNKNOWN for people the center cannot reach. Sampled sources
+    have their exact eccentricities.
+    """
+    # The best center reaches the most people with the least eccentricity
+    center = min(estimate.sampled, key=lambda s: (
+        -estimate.sampled[s][1], estimate.sampled[s][0]
+    ))
+    eccentricity = estimate.sampled[center][0]
+    _, _, farthest = sweep([center])
+
+    upper = bytearray([UNKNOWN]) * graph.num_people()
+    for q, distance in enumerate(farthest):
+        if distance or q == center:
+            upper[q] = min(distance + eccentricity, UNKNOWN - 1)
+    for s, (eccentricity, _) in estimate.sampled.items():
+        estimate.lower[s] = eccentricity
+        upper[s] = eccentricity
+    return upper
+
+
+def save_table(path, stats, estimate, lower, upper, exhaustive,
+               epsilon, confidence):
+    """
+    Writes the eccentricity bounds and separation statistics to a table
+    file at path, recording the source stats they were computed from.
+    """
+    header = {
+        "sources": stats,
+        "exhaustive": exhaustive,
+        "sampled": estimate.sources,
+        "mean": estimate.mean(),
+        "half_width": 0 if exhaustive else estimate.half_width(confidence),
+        "epsilon": epsilon,
+        "confidence": confidence,
+        "histogram": estimate.histogram
+    }
+    write_sections(path, MAGIC, header,
+                   [("lower", "B", lower), ("upper", "B", upper)])
+
+
+class EccentricityTable():
+    """
+    Memory-mapped eccentricity bounds for every person, indexed like
+    the graph, with the separation statistics they came with.
+    """
+
+    def __init__(self, header, lower, upper):
+        self.header = header
+        self.lower = lower
+        self.upper = upper
+
+    def bounds(self, p):
+        """
+        Returns the (lower, upper) bounds on person p's eccentricity,
+        with None for an upper bound that is not known.
+        """
+        upper = self.upper[p]
+        return self.lower[p], None if upper == UNKNOWN else upper
+
+    def distribution(self):
+        """
+        Returns the fraction of connected (source, person) pairs
+        at each distance from 1 up.
+        """
+        counts = self.header["histogram"][1:]
+        total = sum(counts)
+        return [count / total for count in counts] if total else []
+
+
+def load_table(directory):
+    """
+    Returns the EccentricityTable for a data directory,
+    or None if it is missing, malformed, or out of date.
+    """
+    contents = read_sections(os.path.join(directory, TABLE), MAGIC)
+    if contents is None:
+        return None
+    header, sections = contents
+    if header.get("sources") != source_stats(directory):
+        return None
+    try:
+        return EccentricityTable(header, sections["lower"],
+                                 sections["upper"])
+    except KeyError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute degrees of separation statistics and "
+                    "every person's eccentricity."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--exact", action="store_true",
+                        help="search from every person instead of sampling")
+    parser.add_argument("--epsilon", type=float, default=0.05,
+                        help="error bound on the average separation")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="probability the error bound holds")
+    parser.add_argument("--max-sources", type=int, default=10000,
+                        help="most people to sample as sources")
+    parser.add_argument("--batch", type=int, default=128,
+                        help="searches run together in one sweep")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all CPUs)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    # Load once in the parent so forked workers inherit the graph
+    global graph
+    graph = cached_graph(args.directory)
+    start = time.perf_counter()
+    estimate, lower, upper, exhaustive = compute(
+        args.directory, args.epsilon, args.confidence, args.exact,
+        args.batch, args.max_sources, args.workers, args.seed
+    )
+    save_table(
+        os.path.join(args.directory, TABLE), source_stats(args.directory),
+        estimate, lower, upper, exhaustive, args.epsilon, args.confidence
+    )
+
+    print(f"Swept from {estimate.sources} people "
+          f"in {time.perf_counter() - start:.2f}s.")
+    if exhaustive:
+        print(f"Average separation: {estimate.mean():.3f}")
+    else:
+        print(f"Average separation: {estimate.mean():.3f} "
+              f"± {estimate.half_width(args.confidence):.3f} "
+              f"({args.confidence:.0%} confidence)")
+    table = load_table(args.directory)
+    for d, fraction in enumerate(table.distribution(), 1):
+        print(f"{d} degrees: {fraction:.2%}")
+
+
+if __name__ == "__main__":
+    main()
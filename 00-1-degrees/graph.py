@@ -0,0 +1,497 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Mapping
+
+
+class StringTable():
+    """
+    A sequence of strings packed into a single UTF-8 buffer.
+    Strings are decoded only when they are accessed.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        offsets = array("q", [0])
+        chunks = []
+        for string in strings:
+            encoded = string.encode("utf-8")
+            chunks.append(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+        return cls(b"".join(chunks), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class Graph():
+    """
+    People and movies interned to dense integer indices, with
+    compressed sparse row (CSR) adjacency between them.
+
+    The movies of person p are person_movies[person_offsets[p]:
+    person_offsets[p + 1]], and the stars of movie m are likewise
+    movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+    Indices follow the sorted order of the IMDB ids, so ids are
+    resolved to indices by binary search rather than a dict.
+    """
+
+    def __init__(self, person_ids, names, births, movie_ids, titles, years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 name_order):
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Person indices sorted by lowercase name, for name lookups
+        self.name_order = name_order
+
+        # Prefix and fuzzy index of names, if one has been built
+        self.name_index = None
+
+        # Number of people whose neighbors the last search expanded
+        self.nodes_expanded = 0
+
+    def num_people(self):
+        return len(self.person_ids)
+
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def person_index(self, person_id):
+        """
+        Returns the index of an IMDB person id, or None if unknown.
+        """
+        return find(self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of an IMDB movie id, or None if unknown.
+        """
+        return find(self.movie_ids, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns the indices of all people whose name matches
+        `name`, ignoring case.
+        """
+        name = name.lower()
+        order = self.name_order
+        k = bisect_left(
+            range(len(order)), name, key=lambda k: self.names[order[k]].lower()
+        )
+        matches = []
+        while k < len(order) and self.names[order[k]].lower() == name:
+            matches.append(order[k])
+            k += 1
+        return matches
+
+    def movies_of(self, p):
+        return self.person_movies[self.person_offsets[p]:
+                                  self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        return self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def neighbors(self, p):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with person p.
+        """
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                yield m, q
+
+    def path_ids(self, path):
+        """
+        Converts a path of (movie, person) index pairs
+        into a path of (movie_id, person_id) pairs.
+        """
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect person source to person target, by breadth-first
+        search. If no possible path, returns None.
+        """
+        self.nodes_expanded = 0
+        if source == target:
+            return []
+
+        # Maps each reached person to the (movie, person) it was reached from
+        parents = {source: None}
+
+        # Every star of a movie is reached the first time it is expanded,
+        # so no movie ever needs to be expanded twice
+        seen_movies = set()
+
+        frontier = deque([source])
+        while frontier:
+            p = frontier.popleft()
+            self.nodes_expanded += 1
+            for m in self.movies_of(p):
+                if m in seen_movies:
+                    continue
+                seen_movies.add(m)
+                for q in self.stars_of(m):
+                    if q in parents:
+                        continue
+                    parents[q] = (m, p)
+                    if q == target:
+                        return walk(parents, q)
+                    frontier.append(q)
+        return None
+
+    def bidirectional_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect person source to person target, searching
+        breadth-first from both people until the searches meet.
+        If no possible path, returns None.
+        """
+        self.nodes_expanded = 0
+        if source == target:
+            return []
+
+        forward = {source: None}
+        backward = {target: None}
+        forward_movies = set()
+        backward_movies = set()
+        forward_layer = [source]
+        backward_layer = [target]
+
+        while forward_layer and backward_layer:
+
+            # Always grow the smaller layer, since it is cheaper to expand
+            if len(forward_layer) <= len(backward_layer):
+                layer, parents, seen_movies, others = (
+                    forward_layer, forward, forward_movies, backward
+                )
+            else:
+                layer, parents, seen_movies, others = (
+                    backward_layer, backward, backward_movies, forward
+                )
+
+            next_layer = []
+            for p in layer:
+                self.nodes_expanded += 1
+                for m in self.movies_of(p):
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+                    for q in self.stars_of(m):
+                        if q in parents:
+                            continue
+                        parents[q] = (m, p)
+                        if q in others:
+                            return join(forward, backward, q)
+                        next_layer.append(q)
+
+            if parents is forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        return None
+
+    def bfs_tree(self, source):
+        """
+        Runs a full breadth-first search from person source, returning
+        a BFSTree of the (movie, person) each reached person was
+        first reached from.
+        """
+        parent_movies = array("i", [-1]) * self.num_people()
+        parent_people = array("i", [-1]) * self.num_people()
+        parent_people[source] = source
+        seen_movies = bytearray(self.num_movies())
+
+        self.nodes_expanded = 0
+        frontier = deque([source])
+        while frontier:
+            p = frontier.popleft()
+            self.nodes_expanded += 1
+            for m in self.movies_of(p):
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in self.stars_of(m):
+                    if parent_people[q] == -1:
+                        parent_movies[q] = m
+                        parent_people[q] = p
+                        frontier.append(q)
+        return BFSTree(source, parent_movies, parent_people)
+
+    def distances(self, source, target):
+        """
+        Runs a breadth-first search from person source, stopping once
+        the layer holding person target is complete. Returns a bytearray
+        of each reached person's distance from source, with 255 for
+        people not reached, or None if target cannot be reached.
+        """
+        distance = bytearray(b"\xff") * self.num_people()
+        distance[source] = 0
+        seen_movies = set()
+        layer = [source]
+        depth = 0
+        self.nodes_expanded = 0
+        while layer and distance[target] == 255:
+            depth += 1
+            if depth == 255:
+                raise OverflowError("path too long to track")
+            next_layer = []
+            for p in layer:
+                self.nodes_expanded += 1
+                for m in self.movies_of(p):
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+                    for q in self.stars_of(m):
+                        if distance[q] == 255:
+                            distance[q] = depth
+                            next_layer.append(q)
+            layer = next_layer
+        if distance[target] == 255:
+            return None
+        return distance
+
+    def predecessors(self, distance, p):
+        """
+        Yields the (movie, person) pairs one step closer to the source
+        than person p, on shortest paths in a distances() result.
+        """
+        closer = distance[p] - 1
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                if distance[q] == closer:
+                    yield m, q
+
+    def count_shortest_paths(self, source, target, distance=None):
+        """
+        Returns the number of distinct shortest (movie, person) paths
+        from person source to person target, where paths through
+        different movies count separately. A distances() result for
+        the pair may be passed in to avoid searching again.
+        """
+        if distance is None:
+            distance = self.distances(source, target)
+        if distance is None:
+            return 0
+
+        # Push path counts back from the target one layer at a time,
+        # so only people on some shortest path are ever counted
+        counts = {target: 1}
+        for _ in range(distance[target]):
+            closer = {}
+            for p, count in counts.items():
+                for m, q in self.predecessors(distance, p):
+                    closer[q] = closer.get(q, 0) + count
+            counts = closer
+        return counts[source]
+
+    def all_shortest_paths(self, source, target, distance=None):
+        """
+        Lazily yields every shortest list of (movie, person) index pairs
+        that connects person source to person target. A distances()
+        result for the pair may be passed in to avoid searching again.
+        """
+        if distance is None:
+            distance = self.distances(source, target)
+        if distance is None:
+            return
+
+        # Depth-first through predecessors from the target; every
+        # predecessor lies on a shortest path, so no branch is wasted
+        path = []
+        stack = [self.predecessors(distance, target)]
+        people = [target]
+        while stack:
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                people.pop()
+                if path:
+                    path.pop()
+                continue
+            m, q = step
+            path.append((m, people[-1]))
+            if q == source:
+                yield path[::-1]
+                path.pop()
+            else:
+                stack.append(self.predecessors(distance, q))
+                people.append(q)
+        if source == target:
+            yield []
+
+
+class BFSTree():
+    """
+    Parent pointers of a breadth-first search from a single person,
+    in arrays indexed by person. Unreached people have parent -1,
+    and the root is its own parent.
+    """
+
+    def __init__(self, root, parent_movies, parent_people):
+        self.root = root
+        self.parent_movies = parent_movies
+        self.parent_people = parent_people
+
+    def path_to(self, p):
+        """
+        Returns the shortest (movie, person) path from the root
+        to person p, or None if p was not reached.
+        """
+        path = self.path_from(p)
+        if path is None:
+            return None
+
+        # Reverse the steps, so each movie leads to the next person
+        people = [p] + [q for m, q in path]
+        path = [(m, people[i]) for i, (m, q) in enumerate(path)]
+        path.reverse()
+        return path
+
+    def path_from(self, p):
+        """
+        Returns the shortest (movie, person) path from person p
+        to the root, or None if p was not reached.
+        """
+        if self.parent_people[p] == -1:
+            return None
+        path = []
+        while p != self.root:
+            m, p = self.parent_movies[p], self.parent_people[p]
+            path.append((m, p))
+        return path
+
+
+def find(table, key):
+    """
+    Returns the position of key in a sorted StringTable, or None.
+    """
+    i = bisect_left(range(len(table)), key, key=table.__getitem__)
+    if i < len(table) and table[i] == key:
+        return i
+    return None
+
+
+def walk(parents, p):
+    """
+    Follows parent pointers back from person p to the start of
+    the search, returning the (movie, person) path in forward order.
+    """
+    path = []
+    while parents[p] is not None:
+        m, parent = parents[p]
+        path.append((m, p))
+        p = parent
+    path.reverse()
+    return path
+
+
+def join(forward, backward, meeting):
+    """
+    Joins the two halves of a bidirectional search that met at person
+    `meeting` into a (movie, person) path from source to target.
+    """
+    path = walk(forward, meeting)
+    p = meeting
+    while backward[p] is not None:
+        m, p = backward[p]
+        path.append((m, p))
+    return path
+
+
+class PeopleView(Mapping):
+    """
+    Read-only mapping from person_id to a dictionary of:
+    name, birth, movies (a set of movie_ids), built on access.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        p = self.graph.person_index(person_id)
+        if p is None:
+            raise KeyError(person_id)
+        return {
+            "name": self.graph.names[p],
+            "birth": self.graph.births[p],
+            "movies": {self.graph.movie_ids[m] for m in self.graph.movies_of(p)}
+        }
+
+    def __iter__(self):
+        for p in range(self.graph.num_people()):
+            yield self.graph.person_ids[p]
+
+    def __len__(self):
+        return self.graph.num_people()
+
+
+class MoviesView(Mapping):
+    """
+    Read-only mapping from movie_id to a dictionary of:
+    title, year, stars (a set of person_ids), built on access.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        m = self.graph.movie_index(movie_id)
+        if m is None:
+            raise KeyError(movie_id)
+        return {
+            "title": self.graph.titles[m],
+            "year": self.graph.years[m],
+            "stars": {self.graph.person_ids[p] for p in self.graph.stars_of(m)}
+        }
+
+    def __iter__(self):
+        for m in range(self.graph.num_movies()):
+            yield self.graph.movie_ids[m]
+
+    def __len__(self):
+        return self.graph.num_movies()
+
+
+class NamesView(Mapping):
+    """
+    Read-only mapping from lowercase names to a set of person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        matches = self.graph.people_named(name)
+        if not matches or name != name.lower():
+            raise KeyError(name)
+        return {self.graph.person_ids[p] for p in matches}
+
+    def __iter__(self):
+        previous = None
+        for p in self.graph.name_order:
+            name = self.graph.names[p].lower()
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
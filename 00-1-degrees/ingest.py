@@ -0,0 +1,317 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+
+from graph import Graph, StringTable
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process, in bytes,
+    or None where the resource module is unavailable, as on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class IdIndex():
+    """
+    Maps ids from a sorted StringTable back to their positions.
+
+    The table is sorted as strings, so numeric ids, like IMDB's, are
+    sorted again as integers into keys, with positions giving each key's
+    place in the table. Both are arrays, needing 12 bytes per id instead
+    of a dict entry. Other ids fall back to a dict.
+    """
+
+    def __init__(self, table):
+        self.keys = None
+        self.positions = None
+        try:
+            numbers = [int(table[i]) for i in range(len(table))]
+        except ValueError:
+            numbers = None
+
+        # Only canonical spellings round-trip, so "007" stays a string id
+        if numbers is not None and all(
+            table[i] == str(number) for i, number in enumerate(numbers)
+        ):
+            order = sorted(range(len(numbers)), key=numbers.__getitem__)
+            self.keys = array("q", (numbers[i] for i in order))
+            self.positions = array("i", order)
+        else:
+            self.ids = {table[i]: i for i in range(len(table))}
+
+    def get(self, key):
+        if self.keys is None:
+            return self.ids.get(key)
+        try:
+            number = int(key)
+        except ValueError:
+            return None
+        if str(number) != key:
+            return None
+        i = bisect_left(self.keys, number)
+        if i == len(self.keys) or self.keys[i] != number:
+            return None
+        return self.positions[i]
+
+
+def read_table(path, columns):
+    """
+    Reads the given columns of a CSV file by position, returning
+    a StringTable for each column with rows sorted by the first,
+    and the number of rows read.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(column) for column in columns]
+        rows = sorted(tuple(row[i] for i in positions) for row in reader)
+    tables = [
+        StringTable.from_strings(row[i] for row in rows)
+        for i in range(len(columns))
+    ]
+    return tables, len(rows)
+
+
+class EdgeBuffer():
+    """
+    Accumulates (person, movie) edges in memory, spilling them to
+    a temporary file whenever they take up more than memory_limit bytes.
+    """
+
+    def __init__(self, memory_limit):
+        self.memory_limit = memory_limit
+        self.people = array("i")
+        self.movies = array("i")
+        self.spill = None
+        self.spilled = 0
+
+    def __len__(self):
+        return self.spilled + len(self.people)
+
+    def add(self, p, m):
+        self.people.append(p)
+        self.movies.append(m)
+
+    def check(self):
+        """
+        Spills the buffered edges if the memory limit is exceeded.
+        """
+        if self.memory_limit is None or not self.people:
+            return
+        size = (len(self.people) * self.people.itemsize
+                + len(self.movies) * self.movies.itemsize)
+        if size <= self.memory_limit:
+            return
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile()
+        array("q", [len(self.people)]).tofile(self.spill)
+        self.people.tofile(self.spill)
+        self.movies.tofile(self.spill)
+        self.spilled += len(self.people)
+        self.people = array("i")
+        self.movies = array("i")
+
+    def chunks(self):
+        """
+        Yields (people, movies) arrays of every edge added,
+        reading spilled edges back one chunk at a time.
+        """
+        if self.spill is not None:
+            self.spill.seek(0)
+            while True:
+                length = array("q")
+                try:
+                    length.fromfile(self.spill, 1)
+                except EOFError:
+                    break
+                people = array("i")
+                people.fromfile(self.spill, length[0])
+                movies = array("i")
+                movies.fromfile(self.spill, length[0])
+                yield people, movies
+        yield self.people, self.movies
+
+
+def read_edges(path, people, movies, chunk_rows, memory_limit, report):
+    """
+    Streams stars.csv in chunks of rows into an EdgeBuffer,
+    skipping rows with unknown ids.
+    """
+    edges = EdgeBuffer(memory_limit)
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        person_column = header.index("person_id")
+        movie_column = header.index("movie_id")
+        rows = 0
+        start = time.perf_counter()
+        while True:
+            chunk = list(itertools.islice(reader, chunk_rows))
+            if not chunk:
+                break
+            for row in chunk:
+                p = people.get(row[person_column])
+                m = movies.get(row[movie_column])
+                if p is not None and m is not None:
+                    edges.add(p, m)
+            rows += len(chunk)
+            edges.check()
+            report("stars.csv", rows, time.perf_counter() - start)
+    return edges
+
+
+def build_csr(edges, num_people, num_movies):
+    """
+    Builds person->movie and movie->person CSR arrays from an
+    EdgeBuffer, dropping duplicate edges.
+    """
+    # Count each person's edges, then place them
+    person_offsets = array("i", [0]) * (num_people + 1)
+    for people, movies in edges.chunks():
+        for p in people:
+            person_offsets[p + 1] += 1
+    for p in range(num_people):
+        person_offsets[p + 1] += person_offsets[p]
+    person_movies = array("i", [0]) * len(edges)
+    position = person_offsets[:-1]
+    for people, movies in edges.chunks():
+        for p, m in zip(people, movies):
+            person_movies[position[p]] = m
+            position[p] += 1
+    del position
+
+    # Sort each person's movies and drop duplicates in place
+    end = 0
+    start = 0
+    for p in range(num_people):
+        stop = person_offsets[p + 1]
+        unique = sorted(set(person_movies[start:stop]))
+        person_offsets[p] = end
+        person_movies[end:end + len(unique)] = array("i", unique)
+        end += len(unique)
+        start = stop
+    person_offsets[num_people] = end
+    del person_movies[end:]
+
+    # Invert into movie->person adjacency, with stars in person order
+    movie_offsets = array("i", [0]) * (num_movies + 1)
+    for m in person_movies:
+        movie_offsets[m + 1] += 1
+    for m in range(num_movies):
+        movie_offsets[m + 1] += movie_offsets[m]
+    movie_stars = array("i", [0]) * len(person_movies)
+    position = movie_offsets[:-1]
+    for p in range(num_people):
+        for m in person_movies[person_offsets[p]:person_offsets[p + 1]]:
+            movie_stars[position[m]] = p
+            position[m] += 1
+
+    return person_offsets, person_movies, movie_offsets, movie_stars
+
+
+def stream_graph(directory, chunk_rows=100000, memory_limit=None,
+                 report=None):
+    """
+    Load data from CSV files into a Graph, streaming stars.csv
+    in chunks of rows.
+
+    memory_limit, if given, bounds the bytes of edges buffered in memory
+    while stars.csv is read; beyond it they are spilled to disk. It does
+    not bound the whole process: the people and movie tables are held
+    in full, and building the CSR arrays needs up to 8 more bytes for
+    every row of stars.csv, duplicates included, since they are only
+    dropped once each person's movies are grouped.
+
+    report, if given, is called as report(file, rows, seconds)
+    as each file, or chunk of stars.csv, is read.
+    """
+    if report is None:
+        def report(file, rows, seconds):
+            pass
+
+    start = time.perf_counter()
+    (person_ids, names, births), rows = read_table(
+        os.path.join(directory, "people.csv"), ["id", "name", "birth"]
+    )
+    report("people.csv", rows, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    (movie_ids, titles, years), rows = read_table(
+        os.path.join(directory, "movies.csv"), ["id", "title", "year"]
+    )
+    report("movies.csv", rows, time.perf_counter() - start)
+
+    edges = read_edges(
+        os.path.join(directory, "stars.csv"),
+        IdIndex(person_ids), IdIndex(movie_ids),
+        chunk_rows, memory_limit, report
+    )
+    adjacency = build_csr(edges, len(person_ids), len(movie_ids))
+    del edges
+
+    name_order = array("i", sorted(
+        range(len(names)), key=lambda i: names[i].lower()
+    ))
+    return Graph(
+        person_ids, names, births, movie_ids, titles, years,
+        *adjacency, name_order
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream the degrees CSV files into a graph snapshot."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--chunk-rows", type=int, default=100000,
+                        help="rows of stars.csv to read at a time")
+    parser.add_argument("--memory-limit", type=int, default=None,
+                        metavar="MIB",
+                        help="spill edges to disk beyond this much buffered")
+    args = parser.parse_args()
+
+    previous = None
+
+    def report(file, rows, seconds):
+        nonlocal previous
+        if previous is not None and file != previous:
+            print(file=sys.stderr)
+        previous = file
+        rate = rows / seconds if seconds else 0
+        print(f"\r{file}: {rows} rows, {rate:.0f} rows/s", end="",
+              file=sys.stderr)
+
+    memory_limit = None
+    if args.memory_limit is not None:
+        memory_limit = args.memory_limit * 2 ** 20
+
+    # snapshot builds its graphs with stream_graph, so import it here
+    # rather than at the top to avoid a circular import
+    from snapshot import cached_graph
+
+    start = time.perf_counter()
+    cached_graph(args.directory, rebuild=True, chunk_rows=args.chunk_rows,
+                 memory_limit=memory_limit, report=report)
+    print(file=sys.stderr)
+    print(f"Built snapshot in {time.perf_counter() - start:.2f}s", end="")
+    peak = peak_rss()
+    if peak is not None:
+        print(f", peak RSS {peak / 2 ** 20:.1f} MiB", end="")
+    print(".")
+
+
+if __name__ == "__main__":
+    main()
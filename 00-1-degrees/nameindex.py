@@ -0,0 +1,294 @@
+import heapq
+import zlib
+from array import array
+from bisect import bisect_left
+
+from graph import StringTable
+
+# Most people scanned, in order of popularity, to answer one search
+SCAN_LIMIT = 2000
+
+# Most vocabulary words a single query word may expand to
+EXPANSION_LIMIT = 64
+
+
+class NameIndex():
+    """
+    Index of the words in people's names, for prefix and misspelled
+    name lookups.
+
+    Each distinct lowercase word has a posting list of the people whose
+    name contains it, most popular (by movie count) first. Words are
+    found by prefix through their sorted order, and by edit distance
+    through their deletion neighborhoods: a word within k edits of a
+    query shares with it some string left by deleting at most k letters
+    from each. Every word is listed under the CRC-32 of each string its
+    deletions leave, so a lookup bisects integers and never decodes
+    the words it passes over.
+    """
+
+    def __init__(self, graph, words, word_offsets, word_people,
+                 delete_keys, delete_offsets, delete_words):
+        self.graph = graph
+        self.words = words
+        self.word_offsets = word_offsets
+        self.word_people = word_people
+        self.delete_keys = delete_keys
+        self.delete_offsets = delete_offsets
+        self.delete_words = delete_words
+
+    @classmethod
+    def build(cls, graph):
+        """
+        Builds the index for the names of every person in a graph.
+        """
+        postings = {}
+        for p in range(graph.num_people()):
+            for word in set(graph.names[p].lower().split()):
+                postings.setdefault(word, []).append(p)
+        words = sorted(postings)
+
+        # Order each word's people from most to least popular
+        counts = graph.person_offsets
+        word_offsets = array("i", [0])
+        word_people = array("i")
+        for word in words:
+            people = postings.pop(word)
+            people.sort(key=lambda p: (counts[p] - counts[p + 1], p))
+            word_people.extend(people)
+            word_offsets.append(len(word_people))
+
+        # Index each word by as many deletions as the longest query
+        # allowed to match it may make
+        delete_postings = {}
+        for w, word in enumerate(words):
+            for key in delete_keys(word, indexed_edits(len(word))):
+                delete_postings.setdefault(key, []).append(w)
+        keys = array("I", sorted(delete_postings))
+        delete_offsets = array("i", [0])
+        delete_words = array("i")
+        for key in keys:
+            delete_words.extend(delete_postings.pop(key))
+            delete_offsets.append(len(delete_words))
+
+        return cls(
+            graph,
+            StringTable.from_strings(words), word_offsets, word_people,
+            keys, delete_offsets, delete_words
+        )
+
+    def movie_count(self, p):
+        return self.graph.person_offsets[p + 1] - self.graph.person_offsets[p]
+
+    def people_with(self, w):
+        return self.word_people[self.word_offsets[w]:self.word_offsets[w + 1]]
+
+    def prefixed(self, prefix):
+        """
+        Returns the indices of all words starting with prefix.
+        """
+        start = bisect_left(range(len(self.words)), prefix,
+                            key=self.words.__getitem__)
+        end = start
+        while end < len(self.words) and self.words[end].startswith(prefix):
+            end += 1
+        return range(start, end)
+
+    def similar(self, word, max_distance):
+        """
+        Returns a dictionary mapping the indices of words within
+        max_distance edits of word to their edit distance.
+        """
+        candidates = set()
+        for key in delete_keys(word, max_distance):
+            i = bisect_left(self.delete_keys, key)
+            if i < len(self.delete_keys) and self.delete_keys[i] == key:
+                candidates.update(self.delete_words[self.delete_offsets[i]:
+                                                    self.delete_offsets[i + 1]])
+
+        # A shared deletion only bounds the distance by the deletions on
+        # both sides, and keys are hashes that may collide, so check each
+        matches = {}
+        for w in candidates:
+            distance = edit_distance(word, self.words[w], max_distance)
+            if distance is not None:
+                matches[w] = distance
+        return matches
+
+    def match_word(self, word, prefix):
+        """
+        Returns a dictionary mapping indices of vocabulary words
+        that match a query word to their edit distance from it.
+        If prefix is True, words that merely start with the query
+        word also match, at distance 0.
+        """
+        matches = self.similar(word, allowed_edits(word))
+        if prefix:
+            expansions = sorted(
+                self.prefixed(word),
+                key=lambda w: self.word_offsets[w] - self.word_offsets[w + 1]
+            )
+            for w in expansions[:EXPANSION_LIMIT]:
+                matches[w] = 0
+        if len(matches) > EXPANSION_LIMIT:
+            best = heapq.nsmallest(
+                EXPANSION_LIMIT, matches.items(),
+                key=lambda item: (item[1], self.word_offsets[item[0]]
+                                  - self.word_offsets[item[0] + 1])
+            )
+            matches = dict(best)
+        return matches
+
+    def search(self, query, limit=10):
+        """
+        Returns the indices of up to limit people whose names best match
+        query, treating its last word as a prefix and tolerating
+        misspellings. Closer matches come first, then more popular people.
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+        matches = [
+            self.match_word(word, prefix=(i == len(words) - 1))
+            for i, word in enumerate(words)
+        ]
+        if not all(matches):
+            return []
+
+        # Look matches up by the words themselves, to check names quickly
+        by_word = [
+            {self.words[w]: distance for w, distance in match.items()}
+            for match in matches
+        ]
+
+        # Drive the search from the query word with the fewest people,
+        # visiting them from most to least popular
+        pivot = min(matches, key=lambda match: sum(
+            self.word_offsets[w + 1] - self.word_offsets[w] for w in match
+        ))
+        people = heapq.merge(
+            *[self.people_with(w) for w in pivot],
+            key=lambda p: (-self.movie_count(p), p)
+        )
+
+        results = []
+        exact = 0
+        previous = None
+        for scanned, p in enumerate(people):
+
+            # Once limit exact matches are found, everyone left ranks lower
+            if scanned == SCAN_LIMIT or exact == limit:
+                break
+            if p == previous:
+                continue
+            previous = p
+            distance = self.distance(p, by_word)
+            if distance is not None:
+                results.append((distance, -self.movie_count(p), p))
+                exact += distance == 0
+        results.sort()
+        return [p for _, _, p in results[:limit]]
+
+    def distance(self, p, by_word):
+        """
+        Returns the total edit distance between person p's name and
+        the query words, or None if some query word does not match.
+        """
+        words = self.graph.names[p].lower().split()
+        total = 0
+        for match in by_word:
+            distances = [match[w] for w in words if w in match]
+            if not distances:
+                return None
+            total += min(distances)
+        return total
+
+
+def deletions(word, max_deletions):
+    """
+    Returns the set of strings left by deleting at most
+    max_deletions letters from word, word itself included.
+    """
+    strings = {word}
+    layer = {word}
+    for _ in range(max_deletions):
+        layer = {
+            string[:i] + string[i + 1:]
+            for string in layer for i in range(len(string))
+        }
+        strings |= layer
+    return strings
+
+
+def delete_keys(word, max_deletions):
+    """
+    Returns the CRC-32 of each string left by deleting at most
+    max_deletions letters from word.
+    """
+    return {
+        zlib.crc32(string.encode("utf-8"))
+        for string in deletions(word, max_deletions)
+    }
+
+
+def allowed_edits(word):
+    """
+    Returns how many edits a query word may be from a match,
+    allowing fewer for short words.
+    """
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def indexed_edits(length):
+    """
+    Returns the most edits any query may be from a word of the given
+    length and still match it, which is how many deletions of the word
+    the index must hold.
+    """
+    return max(
+        allowed_edits("x" * n) for n in range(max(0, length - 2), length + 3)
+        if abs(n - length) <= allowed_edits("x" * n)
+    )
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Returns the edit distance between a and b, counting insertions,
+    deletions, substitutions and adjacent transpositions,
+    or None if it exceeds max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+
+    # A common prefix or suffix never needs editing
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while (end < len(a) - start and end < len(b) - start
+           and a[-1 - end] == b[-1 - end]):
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (x != y)
+            )
+            if (before is not None and j > 1
+                    and x == b[j - 2] and a[i - 2] == y):
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > max_distance:
+            return None
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
@@ -0,0 +1,215 @@
+import argparse
+import json
+import multiprocessing
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+
+def init_worker(directory, tree_cache):
+    """
+    Loads the data in a worker process, unless it was inherited
+    already loaded from the parent. The snapshot is memory-mapped,
+    so every worker shares the same read-only pages.
+    """
+    if degrees.graph is None:
+        degrees.load_data(directory)
+        degrees.use_tree_cache(tree_cache)
+
+
+# HTTP status for each kind of error an answer can report
+STATUS = {"malformed": 400, "ambiguous": 400, "not found": 404}
+
+
+class QueryError(Exception):
+    """
+    A query that cannot be answered, with the kind of error it is.
+    """
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+def resolve(name):
+    """
+    Returns the person_id for a name, or raises QueryError
+    if there is no such person or the name is ambiguous.
+    """
+    person_ids = degrees.names.get(name.lower())
+    if not person_ids:
+        raise QueryError("not found", f"person not found: {name}")
+    if len(person_ids) > 1:
+        raise QueryError(
+            "ambiguous",
+            f"ambiguous name: {name} ({', '.join(sorted(person_ids))})"
+        )
+    return next(iter(person_ids))
+
+
+def answer(pair):
+    """
+    Answers a (source name, target name) query with a dictionary
+    suitable for encoding as JSON.
+    """
+    source_name, target_name = pair
+    response = {"source": source_name, "target": target_name}
+    try:
+        source = resolve(source_name)
+        target = resolve(target_name)
+    except QueryError as e:
+        response["error"] = str(e)
+        response["kind"] = e.kind
+        return response
+
+    path = degrees.shortest_path(source, target)
+    if path is None:
+        response["degrees"] = None
+        response["path"] = None
+        return response
+
+    response["degrees"] = len(path)
+    response["path"] = [
+        {
+            "movie_id": movie_id,
+            "title": degrees.movies[movie_id]["title"],
+            "person_id": person_id,
+            "name": degrees.people[person_id]["name"]
+        }
+        for movie_id, person_id in path
+    ]
+    return response
+
+
+def answer_line(line):
+    """
+    Answers a (line number, fields) query read by read_lines,
+    reporting a malformed line as an error rather than raising.
+    """
+    number, fields = line
+    if len(fields) != 2:
+        return {
+            "line": number,
+            "error": f"line {number}: expected two tab-separated names",
+            "kind": "malformed"
+        }
+    return answer(fields)
+
+
+def read_lines(f):
+    """
+    Yields the line number and tab-separated fields of each line,
+    skipping blank lines.
+    """
+    for number, line in enumerate(f, 1):
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        yield number, tuple(field.strip() for field in line.split("\t"))
+
+
+def run_batch(args):
+    """
+    Answers every pair in the input file, writing one JSON line per pair
+    in input order.
+    """
+    if args.input == "-":
+        infile = sys.stdin
+    else:
+        infile = open(args.input, encoding="utf-8")
+    with infile, multiprocessing.Pool(
+        args.workers, initializer=init_worker,
+        initargs=(args.directory, args.tree_cache)
+    ) as pool:
+        for response in pool.imap(answer_line, read_lines(infile),
+                                  args.chunksize):
+            print(json.dumps(response))
+
+
+def run_server(args):
+    """
+    Serves queries of the form GET /path?source=NAME&target=NAME
+    over HTTP until interrupted.
+    """
+    pool = multiprocessing.Pool(
+        args.workers, initializer=init_worker,
+        initargs=(args.directory, args.tree_cache)
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path != "/path":
+                self.respond(404, {"error": "not found"})
+            elif "source" not in query or "target" not in query:
+                self.respond(400, {"error": "source and target are required"})
+            else:
+                pair = (query["source"][0], query["target"][0])
+                response = pool.apply(answer, (pair,))
+                status = STATUS.get(response.get("kind"), 200)
+                self.respond(status, response)
+
+        def respond(self, status, response):
+            body = json.dumps(response).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving on http://{args.host}:{args.port}/path", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries against one loaded graph."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("directory", nargs="?", default="large")
+    common.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all CPUs)")
+    common.add_argument("--tree-cache", type=int, default=0, metavar="SIZE",
+                        help="cache BFS trees from up to SIZE people per worker")
+
+    batch = commands.add_parser(
+        "batch", parents=[common],
+        help="read tab-separated name pairs, write JSON lines"
+    )
+    batch.add_argument("--input", default="-",
+                       help="file of name pairs, or - for stdin")
+    batch.add_argument("--chunksize", type=int, default=16)
+    batch.set_defaults(run=run_batch)
+
+    serve = commands.add_parser(
+        "serve", parents=[common], help="answer queries over HTTP"
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8050)
+    serve.set_defaults(run=run_server)
+
+    args = parser.parse_args()
+
+    # Load once in the parent so forked workers inherit the graph
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    degrees.use_tree_cache(args.tree_cache)
+    print("Data loaded.", file=sys.stderr)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+from graph import Graph, StringTable
+from ingest import stream_graph
+from nameindex import NameIndex
+
+# Identifies snapshot files, and changes whenever the layout does
+MAGIC = b"DEGSNAP3"
+
+# Snapshot file name, kept alongside the CSV files it was built from
+SNAPSHOT = "graph.snapshot"
+
+# CSV files whose modification times and sizes validate a snapshot
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Graph attributes stored as StringTables, and as integer arrays
+TABLES = ["person_ids", "names", "births", "movie_ids", "titles", "years"]
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars",
+          "name_order"]
+
+# NameIndex attributes stored as StringTables, and as integer arrays
+INDEX_TABLES = ["words"]
+INDEX_ARRAYS = ["word_offsets", "word_people", "delete_keys",
+                "delete_offsets", "delete_words"]
+
+
+def source_stats(directory):
+    """
+    Returns the modification time and size of each source CSV file.
+    """
+    stats = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats[name] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def write_sections(path, magic, header, buffers):
+    """
+    Writes a file at path holding magic, then a JSON header, then each
+    (name, typecode, buffer) section aligned to 8 bytes. The header
+    records the byte order and where each section lies.
+    """
+    # Lay sections out one after another, each aligned to 8 bytes
+    sections = {}
+    offset = 0
+    for name, typecode, buffer in buffers:
+        size = len(memoryview(buffer).cast("B"))
+        sections[name] = [typecode, offset, size]
+        offset += size + (-size % 8)
+
+    header = json.dumps(dict(
+        header, byteorder=sys.byteorder, sections=sections
+    )).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+
+    # Write to a temporary file first so readers never see a partial file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(magic)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, typecode, buffer in buffers:
+            data = memoryview(buffer).cast("B")
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(temporary, path)
+
+
+def read_sections(path, magic):
+    """
+    Memory-maps a file written by write_sections, returning its header
+    and a dictionary of zero-copy views of its sections, or None if
+    the file is missing, malformed, or from another byte order.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(buffer)
+    try:
+        if view[:len(magic)] != magic:
+            return None
+        (length,) = struct.unpack_from("<Q", view, len(magic))
+        start = len(magic) + 8
+        header = json.loads(str(view[start:start + length], "utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            return None
+
+        # Every section is a zero-copy view into the mapped file,
+        # so check that each lies wholly inside it before slicing
+        base = start + length
+        sections = {}
+        for name, (typecode, offset, size) in header["sections"].items():
+            if offset < 0 or size < 0 or base + offset + size > len(view):
+                return None
+            sections[name] = (
+                view[base + offset:base + offset + size].cast(typecode)
+            )
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+    return header, sections
+
+
+def save_snapshot(graph, path, stats):
+    """
+    Writes the buffers of a graph and its name index to a snapshot
+    file at path, recording the source stats it was built from.
+    """
+    buffers = []
+    for prefix, source, tables, arrays in [
+        ("", graph, TABLES, ARRAYS),
+        ("index.", graph.name_index, INDEX_TABLES, INDEX_ARRAYS)
+    ]:
+        for name in tables:
+            table = getattr(source, name)
+            buffers.append((f"{prefix}{name}.data", "B", table.data))
+            buffers.append((f"{prefix}{name}.offsets", "q", table.offsets))
+        for name in arrays:
+            buffer = getattr(source, name)
+            buffers.append((f"{prefix}{name}", memoryview(buffer).format,
+                            buffer))
+    write_sections(path, MAGIC, {"sources": stats}, buffers)
+
+
+def load_snapshot(path, stats):
+    """
+    Memory-maps a snapshot file and returns the Graph it holds,
+    or None if the file is missing, malformed, or out of date.
+    """
+    contents = read_sections(path, MAGIC)
+    if contents is None:
+        return None
+    header, sections = contents
+    if header.get("sources") != stats:
+        return None
+
+    def buffers(prefix, tables, arrays):
+        return [
+            StringTable(sections[f"{prefix}{name}.data"],
+                        sections[f"{prefix}{name}.offsets"])
+            for name in tables
+        ] + [sections[f"{prefix}{name}"] for name in arrays]
+
+    try:
+        graph = Graph(*buffers("", TABLES, ARRAYS))
+        index = buffers("index.", INDEX_TABLES, INDEX_ARRAYS)
+    except KeyError:
+        return None
+    graph.name_index = NameIndex(graph, *index)
+    return graph
+
+
+def cached_graph(directory, rebuild=False, **options):
+    """
+    Returns the Graph for a data directory, from its snapshot if that
+    is up to date, otherwise by streaming the CSV files and saving a
+    fresh snapshot for next time.
+
+    Any other keyword options are passed on to stream_graph.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    stats = source_stats(directory)
+    if not rebuild:
+        graph = load_snapshot(path, stats)
+        if graph is not None:
+            return graph
+
+    graph = stream_graph(directory, **options)
+    graph.name_index = NameIndex.build(graph)
+    try:
+        save_snapshot(graph, path, stats)
+    except OSError as e:
+        print(f"Could not save snapshot: {e}", file=sys.stderr)
+    return graph
@@ -0,0 +1,119 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import degrees
+import eccentricity
+import nameindex
+import snapshot
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+def setUpModule():
+    # Load from a copy so tests never write a snapshot into small/
+    global directory
+    directory = tempfile.mkdtemp()
+    for name in ["people.csv", "movies.csv", "stars.csv"]:
+        shutil.copy(os.path.join(SMALL, name), directory)
+    degrees.load_data(directory)
+
+
+def tearDownModule():
+    shutil.rmtree(directory)
+
+
+class TestShortestPaths(unittest.TestCase):
+
+    def test_count_matches_enumeration(self):
+        graph = degrees.graph
+        rng = random.Random(0)
+        for _ in range(200):
+            s = rng.randrange(graph.num_people())
+            t = rng.randrange(graph.num_people())
+            paths = list(graph.all_shortest_paths(s, t))
+            self.assertEqual(graph.count_shortest_paths(s, t), len(paths))
+            self.assertEqual(len(set(map(tuple, paths))), len(paths))
+            shortest = graph.shortest_path(s, t)
+            if shortest is None:
+                self.assertEqual(paths, [])
+            else:
+                self.assertTrue(all(len(p) == len(shortest) for p in paths))
+
+    def test_shortest_paths(self):
+        count, paths = degrees.shortest_paths("129", "398", 5)
+        self.assertEqual(count, len(paths))
+        self.assertEqual(len(paths), 2)
+        for path in paths:
+            self.assertEqual(len(path), 3)
+            self.assertEqual(path[-1][1], "398")
+
+
+class TestEccentricity(unittest.TestCase):
+
+    def test_sweep_matches_single_searches(self):
+        graph = degrees.graph
+        eccentricity.graph = graph
+        sources = list(range(graph.num_people()))
+        stats, histogram, farthest = eccentricity.sweep(sources)
+        pairs = 0
+        for s, (largest, reached, total) in zip(sources, stats):
+            distances = [len(graph.shortest_path(s, t))
+                         for t in range(graph.num_people())
+                         if t != s and graph.shortest_path(s, t) is not None]
+            self.assertEqual(largest, max(distances, default=0))
+            self.assertEqual(reached, len(distances))
+            self.assertEqual(total, sum(distances))
+            pairs += len(distances)
+        self.assertEqual(sum(histogram[1:]), pairs)
+        self.assertEqual(list(farthest), [s[0] for s in stats])
+
+
+class TestNameIndex(unittest.TestCase):
+
+    def test_short_word_misspelling(self):
+        # "tim" shares no trigram with "tom", only the deletion "tm"
+        index = degrees.graph.name_index
+        found = [degrees.graph.person_ids[p]
+                 for p in index.search("tim hanks")]
+        self.assertIn("158", found)
+
+    def test_similar_matches_every_word_in_range(self):
+        index = degrees.graph.name_index
+        words = [index.words[w] for w in range(len(index.words))]
+        rng = random.Random(0)
+        for _ in range(300):
+            word = list(rng.choice(words))
+            for _ in range(rng.randint(0, 2)):
+                i = rng.randrange(len(word) + 1)
+                word[i:i + rng.randint(0, 1)] = rng.choice("aeiknrst")
+            word = "".join(word)
+            max_distance = nameindex.allowed_edits(word)
+            expected = {}
+            for w, other in enumerate(words):
+                distance = nameindex.edit_distance(word, other, max_distance)
+                if distance is not None:
+                    expected[w] = distance
+            self.assertEqual(index.similar(word, max_distance), expected)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_truncated_snapshot_is_rebuilt(self):
+        path = os.path.join(directory, snapshot.SNAPSHOT)
+        with open(path, "rb") as f:
+            data = f.read()
+        stats = snapshot.source_stats(directory)
+        for size in [len(data) // 2, len(data) // 2 // 8 * 8, 12]:
+            with open(path, "wb") as f:
+                f.write(data[:size])
+            self.assertIsNone(snapshot.load_snapshot(path, stats))
+            graph = snapshot.cached_graph(directory)
+            self.assertEqual(graph.people_named("Tom Hanks"),
+                             degrees.graph.people_named("Tom Hanks"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+
+class TreeCache():
+    """
+    Least-recently-used cache of full BFS trees, keyed by root person.
+
+    A query whose source has a cached tree is answered by walking the
+    target's parent pointers. Since the graph is undirected, a query
+    whose target has a cached tree is answered the same way from the
+    source, and the path reversed.
+
+    Building a tree costs a full BFS, so misses are answered by an
+    ordinary early-exit search. A person only gets a tree once they
+    miss a second time, as source or target, while still remembered
+    from their first miss.
+    """
+
+    def __init__(self, graph, size=16):
+        self.graph = graph
+        self.size = size
+        self.trees = OrderedDict()
+
+        # People who have missed once, most recent last
+        self.candidates = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.trees)
+
+    def lookup(self, p):
+        """
+        Returns the cached tree rooted at person p, or None,
+        marking it as the most recently used.
+        """
+        tree = self.trees.get(p)
+        if tree is not None:
+            self.trees.move_to_end(p)
+        return tree
+
+    def admit(self, p):
+        """
+        Records a miss from person p, returning True if p has missed
+        before and so should have a tree built.
+        """
+        if p in self.candidates:
+            del self.candidates[p]
+            return True
+        self.candidates[p] = None
+        if len(self.candidates) > 8 * self.size:
+            self.candidates.popitem(last=False)
+        return False
+
+    def tree(self, p):
+        """
+        Returns the tree rooted at person p, building and caching it
+        if needed, and evicting the least recently used tree if full.
+        """
+        tree = self.lookup(p)
+        if tree is None:
+            tree = self.graph.bfs_tree(p)
+            self.trees[p] = tree
+            if len(self.trees) > self.size:
+                self.trees.popitem(last=False)
+        return tree
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect person source to person target.
+        If no possible path, returns None.
+        """
+        self.graph.nodes_expanded = 0
+        tree = self.lookup(source)
+        if tree is not None:
+            self.hits += 1
+            return tree.path_to(target)
+        tree = self.lookup(target)
+        if tree is not None:
+            self.hits += 1
+            return tree.path_from(source)
+        self.misses += 1
+        if self.admit(source):
+            return self.tree(source).path_to(target)
+        if self.admit(target):
+            return self.tree(target).path_from(source)
+        return self.graph.shortest_path(source, target)
@@ -0,0 +1,153 @@
+"""
+Tic Tac Toe search benchmarks
+"""
+
+import argparse
+import math
+import time
+
+import book
+import tictactoe as ttt
+
+def baseline_minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    and the number of positions visited, searching the whole game tree
+    the way minimax originally did.
+    """
+    visited = 0
+
+    def max_value(board):
+        nonlocal visited
+        visited += 1
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        v = -math.inf
+        for action in ttt.actions(board):
+            v = max(v, min_value(ttt.result(board, action)))
+        return v
+
+    def min_value(board):
+        nonlocal visited
+        visited += 1
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        v = math.inf
+        for action in ttt.actions(board):
+            v = min(v, max_value(ttt.result(board, action)))
+        return v
+
+    if ttt.terminal(board):
+        return None, visited
+    best_action = None
+    if ttt.player(board) == ttt.X:
+        best_value = -math.inf
+        for action in ttt.actions(board):
+            value = min_value(ttt.result(board, action))
+            if value > best_value:
+                best_value = value
+                best_action = action
+    else:
+        best_value = math.inf
+        for action in ttt.actions(board):
+            value = max_value(ttt.result(board, action))
+            if value < best_value:
+                best_value = value
+                best_action = action
+    return best_action, visited
+
+def positions():
+    """
+    Returns a list of (description, board) positions to benchmark:
+    the empty board, and each of X's possible first moves.
+    """
+    boards = [("empty board", ttt.initial_state())]
+    for action in sorted(ttt.actions(ttt.initial_state())):
+        boards.append((f"X at {action}",
+                       ttt.result(ttt.initial_state(), action)))
+    return boards
+
+def search(board):
+    """
+    Returns the action minimax chooses on the board by searching,
+    without the book, the number of positions it searched, and the
+    seconds it took.
+    """
+    ttt.nodes_visited = 0
+    start = time.perf_counter()
+    action = ttt.search_move(board)
+    return action, ttt.nodes_visited, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count the positions minimax visits with each "
+                    "move ordering, with and without symmetry reduction."
+    )
+    parser.add_argument("--skip-baseline", action="store_true",
+                        help="skip the slow full-tree search")
+    args = parser.parse_args()
+
+    # Search each position with every ordering and symmetry reduction,
+    # then once more without symmetry for comparison
+    settings = [(None, True), ("static", True), ("history", True),
+                ("static", False)]
+    print(f"{'position':<16}{'baseline':>10}{'None':>10}{'static':>10}"
+          f"{'history':>10}{'no sym':>10}{'warm':>6}{'static ms':>11}")
+    for description, board in positions():
+        counts = []
+        moves = set()
+        for ordering, symmetry in settings:
+
+            # Search each position from an empty table and history
+            ttt.move_ordering = ordering
+            ttt.use_symmetry = symmetry
+            ttt.transposition_table.clear()
+            ttt.history.clear()
+            action, visited, seconds = search(board)
+            moves.add(action)
+            counts.append(visited)
+            if (ordering, symmetry) == ("static", True):
+                milliseconds = seconds * 1000
+                _, warm, _ = search(board)
+
+        if args.skip_baseline:
+            baseline = "-"
+        else:
+            expected, baseline = baseline_minimax(board)
+            if moves != {expected}:
+                raise Exception(f"moves disagree on {description}: "
+                                f"{expected} and {moves}")
+        print(f"{description:<16}{baseline:>10}"
+              + "".join(f"{count:>10}" for count in counts)
+              + f"{warm:>6}{milliseconds:>11.2f}")
+
+    # Compare the table sizes after solving the empty board
+    sizes = []
+    for symmetry in [False, True]:
+        ttt.move_ordering = "static"
+        ttt.use_symmetry = symmetry
+        ttt.transposition_table.clear()
+        ttt.search_move(ttt.initial_state())
+        sizes.append(len(ttt.transposition_table))
+    positions_count = len(book.reachable())
+    classes = len({state.canonical()[0] for state in book.reachable()})
+    print(f"Reachable positions: {positions_count}, "
+          f"symmetry classes: {classes} "
+          f"({positions_count / classes:.1f}x fewer).")
+    print(f"Table entries from the empty board: {sizes[0]} by position, "
+          f"{sizes[1]} by symmetry class.")
+
+    # Time minimax answering from the book, including reading it
+    ttt.book = None
+    start = time.perf_counter()
+    ttt.minimax(ttt.initial_state())
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for description, board in positions():
+        ttt.minimax(board)
+    later = (time.perf_counter() - start) / len(positions())
+    print(f"Book: first move {first * 1000:.2f}ms including reading it, "
+          f"then {later * 1e6:.0f}us per move.")
+
+if __name__ == "__main__":
+    main()
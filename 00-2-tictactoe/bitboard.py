@@ -0,0 +1,188 @@
+"""
+Bitboard Tic Tac Toe state
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Cell (i, j) is bit 3 * i + j of each player's mask
+CELLS = 9
+FULL = (1 << CELLS) - 1
+
+# Masks of the three cells in each row, column and diagonal
+LINES = (
+    [0b111 << 3 * i for i in range(3)]
+    + [0b001001001 << j for j in range(3)]
+    + [0b100010001, 0b001010100]
+)
+
+# Whether each possible mask of one player's cells contains a line,
+# so checking for a win is a single lookup
+WINS = tuple(
+    any(mask & line == line for line in LINES) for mask in range(1 << CELLS)
+)
+
+# The eight symmetries of the board, as the cell (i, j) moves to under
+# each: the identity, three rotations, and four reflections
+SYMMETRIES = [
+    [3 * a + b for a, b in (move(i, j) for i in range(3) for j in range(3))]
+    for move in [
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i)
+    ]
+]
+
+# Each symmetry's inverse, to map a cell back again
+INVERSES = [
+    [permutation.index(i) for i in range(CELLS)]
+    for permutation in SYMMETRIES
+]
+
+# Every 9-bit mask under each symmetry, so transforming is a lookup
+TRANSFORMS = [
+    tuple(
+        sum(1 << permutation[i] for i in range(CELLS) if mask >> i & 1)
+        for mask in range(1 << CELLS)
+    )
+    for permutation in SYMMETRIES
+]
+
+def index(action):
+    """
+    Returns the bit index of action (i, j).
+    """
+    i, j = action
+    return 3 * i + j
+
+def action(index):
+    """
+    Returns the action (i, j) of a bit index.
+    """
+    return divmod(index, 3)
+
+class Bitboard():
+    """
+    A board as two 9-bit masks, one of each player's cells.
+    Moves are made and unmade in place, without allocating.
+    """
+
+    __slots__ = ("x", "o", "turn")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+        self.turn = X if bin(x).count("1") == bin(o).count("1") else O
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Returns the Bitboard of a list-of-lists board.
+        """
+        x = o = 0
+        for i in range(3):
+            for j in range(3):
+                if board[i][j] == X:
+                    x |= 1 << 3 * i + j
+                elif board[i][j] == O:
+                    o |= 1 << 3 * i + j
+        return cls(x, o)
+
+    def to_board(self):
+        """
+        Returns the list-of-lists board of this Bitboard.
+        """
+        board = [[EMPTY] * 3 for _ in range(3)]
+        for i in range(3):
+            for j in range(3):
+                bit = 1 << 3 * i + j
+                if self.x & bit:
+                    board[i][j] = X
+                elif self.o & bit:
+                    board[i][j] = O
+        return board
+
+    def key(self):
+        """
+        Returns an integer identifying the position.
+        """
+        return self.x | self.o << CELLS
+
+    def canonical(self):
+        """
+        Returns the smallest key of any symmetric equivalent of the
+        position, and the index of the symmetry that produces it.
+        Symmetric positions share a canonical key, and a cell i of this
+        board is cell SYMMETRIES[symmetry][i] of the canonical one.
+        """
+        return min(
+            (transform[self.x] | transform[self.o] << CELLS, symmetry)
+            for symmetry, transform in enumerate(TRANSFORMS)
+        )
+
+    def empty(self):
+        """
+        Returns the mask of empty cells.
+        """
+        return FULL & ~(self.x | self.o)
+
+    def moves(self):
+        """
+        Returns the bit indices of the empty cells, in increasing order.
+        """
+        empty = self.empty()
+        return [i for i in range(CELLS) if empty >> i & 1]
+
+    def move(self, i):
+        """
+        Marks cell i for the player to move.
+        """
+        if self.turn == X:
+            self.x |= 1 << i
+            self.turn = O
+        else:
+            self.o |= 1 << i
+            self.turn = X
+
+    def unmove(self, i):
+        """
+        Clears cell i, undoing the last move, which must have been there.
+        """
+        if self.turn == O:
+            self.x &= ~(1 << i)
+            self.turn = X
+        else:
+            self.o &= ~(1 << i)
+            self.turn = O
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if WINS[self.x]:
+            return X
+        if WINS[self.o]:
+            return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return WINS[self.x] or WINS[self.o] or self.x | self.o == FULL
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if WINS[self.x]:
+            return 1
+        if WINS[self.o]:
+            return -1
+        return 0
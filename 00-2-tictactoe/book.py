@@ -0,0 +1,153 @@
+"""
+Perfect-play opening book for Tic Tac Toe
+"""
+
+import argparse
+import math
+import os
+import sys
+from array import array
+
+from bitboard import INVERSES, SYMMETRIES, Bitboard, action, index
+
+# Book file, kept alongside this module
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Stored in place of a move for finished positions
+NO_MOVE = 15
+
+def pack(key, value, move):
+    """
+    Packs a canonical key, a value of -1, 0 or 1, and a move in the
+    canonical position's cells into one integer of a book file.
+    """
+    return key << 6 | (value + 1) << 4 | (NO_MOVE if move is None else move)
+
+def unpack(entry):
+    """
+    Returns the (key, value, move) packed into a book entry.
+    """
+    move = entry & 0b1111
+    return (entry >> 6, (entry >> 4 & 0b11) - 1,
+            None if move == NO_MOVE else move)
+
+def read_book(path=BOOK):
+    """
+    Reads a book file into a dictionary mapping canonical keys
+    to (value, move) pairs. Raises OSError if it cannot be read.
+    """
+    entries = array("I")
+    with open(path, "rb") as f:
+        entries.frombytes(f.read())
+    if sys.byteorder == "big":
+        entries.byteswap()
+    book = {}
+    for entry in entries:
+        key, value, move = unpack(entry)
+        book[key] = (value, move)
+    return book
+
+def write_book(book, path=BOOK):
+    """
+    Writes a dictionary mapping canonical keys to (value, move) pairs
+    to a book file, as little-endian 32-bit entries sorted by key.
+    """
+    entries = array("I", sorted(
+        pack(key, value, move) for key, (value, move) in book.items()
+    ))
+    if sys.byteorder == "big":
+        entries.byteswap()
+    with open(path, "wb") as f:
+        f.write(entries.tobytes())
+
+def reachable():
+    """
+    Returns a list of a Bitboard of every position reachable
+    from the empty board.
+    """
+    seen = set()
+    positions = []
+    state = Bitboard()
+
+    def visit():
+        if state.key() in seen:
+            return
+        seen.add(state.key())
+        positions.append(Bitboard(state.x, state.o))
+        if not state.terminal():
+            for i in state.moves():
+                state.move(i)
+                visit()
+                state.unmove(i)
+
+    visit()
+    return positions
+
+def generate():
+    """
+    Solves every reachable position once with the search, returning
+    a book of each symmetry class's value and a best move.
+    """
+    # tictactoe reads its book with this module, so import it here
+    # rather than at the top to avoid a circular import
+    import tictactoe as ttt
+    book = {}
+    for state in reachable():
+        key, symmetry = state.canonical()
+        if key in book:
+            continue
+        value = ttt.alphabeta(state, -math.inf, math.inf)
+        move = None
+        if not state.terminal():
+            best = ttt.search_move(state.to_board())
+            move = SYMMETRIES[symmetry][index(best)]
+        book[key] = (value, move)
+    return book
+
+def verify(book):
+    """
+    Checks the book against a fresh search on every reachable position,
+    returning the number of positions checked. Raises an Exception if
+    a value differs, a book move is not optimal, or minimax would
+    answer from the book differently than by searching.
+    """
+    import tictactoe as ttt
+    ttt.transposition_table.clear()
+    checked = 0
+    for state in reachable():
+        key, symmetry = state.canonical()
+        value, move = book[key]
+        board = state.to_board()
+        if value != ttt.value(board):
+            raise Exception(f"value differs on {board}")
+        if not state.terminal():
+            best = action(INVERSES[symmetry][move])
+            if ttt.value(ttt.result(board, best)) != value:
+                raise Exception(f"book move {best} is not optimal on {board}")
+            if ttt.book_move(board, book) != ttt.search_move(board):
+                raise Exception(f"book and search choose differently "
+                                f"on {board}")
+        checked += 1
+    return checked
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate or verify the Tic Tac Toe opening book."
+    )
+    parser.add_argument("--verify", action="store_true",
+                        help="check the saved book against the search")
+    args = parser.parse_args()
+
+    if args.verify:
+        book = read_book()
+        checked = verify(book)
+        print(f"Book of {len(book)} entries agrees with the search "
+              f"on all {checked} reachable positions.")
+    else:
+        book = generate()
+        write_book(book)
+        print(f"Wrote {len(book)} entries, {os.path.getsize(BOOK)} bytes, "
+              f"to {BOOK}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+m,n,k-game engine: k in a row on an m by n board
+"""
+
+import argparse
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Value of a win, less one for each move it takes to reach,
+# so the engine prefers quicker wins and slower losses
+WIN = 10 ** 9
+
+# Values beyond this are wins or losses rather than heuristic estimates
+WON = WIN - 10 ** 6
+
+# Nodes searched between checks of the clock
+CLOCK_INTERVAL = 1024
+
+class Game():
+    """
+    The rules of an m,n,k-game: players take turns marking cells of
+    an m by n board, and the first to mark k in a row, column or
+    diagonal wins. Cell (i, j) is bit n * i + j of a player's mask.
+    """
+
+    def __init__(self, m, n, k):
+        if k > max(m, n):
+            raise ValueError("k in a row does not fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.cells = m * n
+        self.full = (1 << self.cells) - 1
+
+        # Masks of every k cells in a line, and the lines through each cell
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.lines.append(sum(
+                            1 << n * (i + di * t) + j + dj * t
+                            for t in range(k)
+                        ))
+        self.lines_through = [
+            [line for line in self.lines if line >> c & 1]
+            for c in range(self.cells)
+        ]
+
+        # Cells nearer the middle take part in more lines, so try them first
+        self.centrality = [len(lines) for lines in self.lines_through]
+
+    def action(self, c):
+        """
+        Returns the action (i, j) of cell c.
+        """
+        return divmod(c, self.n)
+
+    def cell(self, action):
+        """
+        Returns the cell of action (i, j).
+        """
+        i, j = action
+        return self.n * i + j
+
+class State():
+    """
+    A position in a Game, with a mask of each player's cells.
+    Moves are made and unmade in place.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.x = 0
+        self.o = 0
+        self.turn = X
+        self.winner = None
+
+        # Cells marked so far, and the winner before each was marked
+        self.stack = []
+
+    @classmethod
+    def from_board(cls, game, board):
+        """
+        Returns the State of a list-of-lists board, which must not
+        hold a finished game.
+        """
+        state = cls(game)
+        xs = [game.cell((i, j)) for i in range(game.m) for j in range(game.n)
+              if board[i][j] == X]
+        os = [game.cell((i, j)) for i in range(game.m) for j in range(game.n)
+              if board[i][j] == O]
+        if len(xs) - len(os) not in (0, 1):
+            raise ValueError("invalid board")
+        for c in range(len(xs) + len(os)):
+            state.move(xs[c // 2] if c % 2 == 0 else os[c // 2])
+        return state
+
+    def to_board(self):
+        """
+        Returns the list-of-lists board of this State.
+        """
+        board = [[EMPTY] * self.game.n for _ in range(self.game.m)]
+        for c in range(self.game.cells):
+            i, j = self.game.action(c)
+            if self.x >> c & 1:
+                board[i][j] = X
+            elif self.o >> c & 1:
+                board[i][j] = O
+        return board
+
+    def key(self):
+        """
+        Returns an integer identifying the position.
+        """
+        return self.x | self.o << self.game.cells
+
+    def moves(self):
+        """
+        Returns the empty cells, most central first.
+        """
+        empty = self.game.full & ~(self.x | self.o)
+        moves = [c for c in range(self.game.cells) if empty >> c & 1]
+        moves.sort(key=lambda c: -self.game.centrality[c])
+        return moves
+
+    def move(self, c):
+        """
+        Marks cell c for the player to move, checking only the lines
+        through it for a win.
+        """
+        self.stack.append((c, self.winner))
+        if self.turn == X:
+            self.x |= 1 << c
+            mask = self.x
+            self.turn = O
+        else:
+            self.o |= 1 << c
+            mask = self.o
+            self.turn = X
+        if self.winner is None:
+            for line in self.game.lines_through[c]:
+                if mask & line == line:
+                    self.winner = X if self.turn == O else O
+                    break
+
+    def unmove(self):
+        """
+        Undoes the last move.
+        """
+        c, self.winner = self.stack.pop()
+        if self.turn == O:
+            self.x &= ~(1 << c)
+            self.turn = X
+        else:
+            self.o &= ~(1 << c)
+            self.turn = O
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner is not None or self.x | self.o == self.game.full
+
+def open_lines(state):
+    """
+    Returns a heuristic value of a State for X: each line only one
+    player has marked counts for them, more the more cells they hold.
+    """
+    score = 0
+    for line in state.game.lines:
+        xs = bin(state.x & line).count("1")
+        os = bin(state.o & line).count("1")
+        if xs and not os:
+            score += 4 ** xs
+        elif os and not xs:
+            score -= 4 ** os
+    return score
+
+class TimeUp(Exception):
+    """
+    Raised inside a search that has run past its deadline.
+    """
+
+class Engine():
+    """
+    Iterative-deepening alpha-beta search for a Game, with a
+    wall-clock budget per move and a pluggable heuristic that
+    estimates the value of positions where the search stops.
+
+    Each completed iteration leaves the best move of every position
+    it searched in a transposition table, and the root moves ranked
+    by value, so the next, deeper iteration tries the best moves
+    first and prunes more.
+    """
+
+    def __init__(self, game, heuristic=open_lines, budget=1.0):
+        self.game = game
+        self.heuristic = heuristic
+        self.budget = budget
+
+        # Maps position keys to (depth, value, bound, best move)
+        self.table = {}
+
+        # Weighted count of the cutoffs caused by each cell
+        self.history = [0] * game.cells
+
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = math.inf
+
+    def search(self, state, depth, alpha, beta):
+        """
+        Returns the value of state searched depth moves deep, if it lies
+        strictly between alpha and beta, otherwise a bound as in
+        alpha-beta. Values are from X's point of view.
+        """
+        self.nodes += 1
+        if (self.nodes % CLOCK_INTERVAL == 0
+                and time.perf_counter() > self.deadline):
+            raise TimeUp()
+        if state.winner == X:
+            return WIN
+        if state.winner == O:
+            return -WIN
+        if state.x | state.o == self.game.full:
+            return 0
+        if depth == 0:
+            return self.heuristic(state)
+
+        key = state.key()
+        hint = None
+        entry = self.table.get(key)
+        if entry is not None:
+            stored_depth, v, bound, hint = entry
+            if stored_depth >= depth and (
+                    bound == "exact"
+                    or bound == "lower" and v >= beta
+                    or bound == "upper" and v <= alpha):
+                return v
+
+        original_alpha, original_beta = alpha, beta
+        maximizing = state.turn == X
+        v = -math.inf if maximizing else math.inf
+        best = None
+        moves = sorted(state.moves(), key=lambda c: -self.history[c])
+        if hint is not None:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        for c in moves:
+            state.move(c)
+            child = backed_up(self.search(state, depth - 1, alpha, beta))
+            state.unmove()
+            if maximizing and child > v or not maximizing and child < v:
+                v = child
+                best = c
+            if maximizing:
+                alpha = max(alpha, v)
+            else:
+                beta = min(beta, v)
+            if alpha >= beta:
+                self.history[c] += depth * depth
+                break
+
+        if v <= original_alpha:
+            bound = "upper"
+        elif v >= original_beta:
+            bound = "lower"
+        else:
+            bound = "exact"
+        self.table[key] = (depth, v, bound, best)
+        return v
+
+    def best_move(self, state):
+        """
+        Returns the best cell found for the player to move in state
+        within the time budget, and its value.
+
+        Searches one move deep, then two, and so on, keeping the result
+        of the deepest search to finish. The first search always runs
+        to completion, so there is always a move.
+        """
+        if state.terminal():
+            return None, None
+        self.nodes = 0
+        self.deadline = math.inf
+        start = time.perf_counter()
+        height = len(state.stack)
+        maximizing = state.turn == X
+        ranked = state.moves()
+        best = None
+
+        for depth in range(1, len(ranked) + 1):
+            values = {}
+            alpha, beta = -math.inf, math.inf
+            try:
+                for c in ranked:
+                    state.move(c)
+                    v = backed_up(self.search(state, depth - 1, alpha, beta))
+                    state.unmove()
+                    values[c] = v
+                    if maximizing:
+                        alpha = max(alpha, v)
+                    else:
+                        beta = min(beta, v)
+            except TimeUp:
+
+                # Unwind the moves the interrupted search left made
+                while len(state.stack) > height:
+                    state.unmove()
+                break
+
+            # Rank the root moves by this iteration's values for the next;
+            # all but the best are only bounds, but still a fair guide
+            ranked.sort(key=lambda c: -values[c] if maximizing else values[c])
+            best = (ranked[0], values[ranked[0]])
+            self.depth = depth
+            self.deadline = start + self.budget
+
+            # Stop at a forced result, or when out of time
+            if abs(best[1]) > WON or time.perf_counter() > self.deadline:
+                break
+        return best
+
+def backed_up(v):
+    """
+    Moves a win or loss value one step toward zero, as it is passed
+    back up to the previous move, so nearer results count for more.
+    """
+    if v > WON:
+        return v - 1
+    if v < -WON:
+        return v + 1
+    return v
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch the engine play an m,n,k-game against itself."
+    )
+    parser.add_argument("m", type=int, help="rows")
+    parser.add_argument("n", type=int, help="columns")
+    parser.add_argument("k", type=int, help="marks in a row to win")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds to think per move")
+    args = parser.parse_args()
+
+    game = Game(args.m, args.n, args.k)
+    state = State(game)
+    engines = {X: Engine(game, budget=args.budget),
+               O: Engine(game, budget=args.budget)}
+    while not state.terminal():
+        engine = engines[state.turn]
+        start = time.perf_counter()
+        c, v = engine.best_move(state)
+        print(f"{state.turn} plays {game.action(c)}: depth {engine.depth}, "
+              f"{engine.nodes} nodes, {time.perf_counter() - start:.2f}s")
+        state.move(c)
+        for row in state.to_board():
+            print(" ".join(cell or "." for cell in row))
+    print(f"Winner: {state.winner}" if state.winner else "Tie.")
+
+if __name__ == "__main__":
+    main()
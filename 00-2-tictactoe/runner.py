@@ -1,8 +1,10 @@
 import pygame
 import sys
 import time
+from collections import deque
 
 import tictactoe as ttt
+from worker import Search
 
 pygame.init()
 size = width, height = 600, 400
@@ -13,18 +15,29 @@ white = (255, 255, 255)
 
 screen = pygame.display.set_mode(size)
 
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Frames per second to render at, and the recent frame times in ms
+fps = 60
+clock = pygame.time.Clock()
+frame_times = deque(maxlen=fps)
+
+# Seconds the computer appears to think for, at least
+thinking_time = 0.5
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+search = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if search is not None:
+                search.cancel.set()
             sys.exit()
 
     screen.fill(black)
@@ -108,15 +121,13 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, searching in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if search is None:
+                search = Search(board, thinking_time)
+            elif search.ready():
+                board = ttt.result(board, search.move())
+                search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +152,17 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    if search is not None:
+                        search.cancel.set()
+                        search = None
+
+    # Show the latest and worst recent frame times, to spot stalls
+    frame_times.append(clock.get_time())
+    overlay = smallFont.render(
+        f"frame {frame_times[-1]} ms, worst {max(frame_times)} ms",
+        True, white
+    )
+    screen.blit(overlay, (5, height - 20))
 
     pygame.display.flip()
+    clock.tick(fps)
@@ -5,10 +5,50 @@ Tic Tac Toe Player
 import copy
 import math
 
+from bitboard import INVERSES, SYMMETRIES, Bitboard, index
+from book import read_book
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Minimax values of positions already searched, as (value, bound, move)
+# entries keyed by Bitboard.canonical() key, so that symmetric positions
+# share one entry. The move is the best found, in the canonical position's
+# cells. Kept for the life of the process, so later calls reuse earlier
+# searches
+transposition_table = {}
+
+# Whether to key the table by symmetry class rather than exact position
+use_symmetry = True
+
+# Whether a stored value is exact, or only a lower or upper bound
+# because the search that found it was cut off
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Number of positions searched, rather than looked up, since last reset
+nodes_visited = 0
+
+# Order in which alpha-beta tries moves: "static" for the center, then
+# corners, then edges; "history" for the moves that have caused the
+# most cutoffs so far; or None for cell order
+move_ordering = "static"
+
+# Rank of each cell, by bit index, under static ordering, lower first
+STATIC_RANK = [1, 2, 1,
+               2, 0, 2,
+               1, 2, 1]
+
+# Weighted count of the cutoffs caused by moving in each cell,
+# by bit index, for history ordering
+history = {}
+
+# Value and best move of every reachable position's symmetry class,
+# read from the book file the first time minimax needs it
+book = None
+
 def initial_state():
     """
     Returns starting state of the board.
@@ -73,46 +113,158 @@ def utility(board):
         return -1
     return 0
 
-def minimax(board):
+def ordered_moves(state):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the bit indices of the empty cells of a Bitboard,
+    in the order set by move_ordering.
     """
-    if terminal(board):
-        return None
-    
-    current_player = player(board)
-    
-    def max_value(board):
-        if terminal(board):
-            return utility(board)
-        v = -math.inf
-        for action in actions(board):
-            v = max(v, min_value(result(board, action)))
-        return v
-    
-    def min_value(board):
-        if terminal(board):
-            return utility(board)
-        v = math.inf
-        for action in actions(board):
-            v = min(v, max_value(result(board, action)))
+    moves = state.moves()
+    if move_ordering == "static":
+        moves.sort(key=STATIC_RANK.__getitem__)
+    elif move_ordering == "history":
+        moves.sort(key=lambda i: (-history.get(i, 0), STATIC_RANK[i]))
+    return moves
+
+class Cancelled(Exception):
+    """
+    Raised by a search whose cancellation token has been set.
+    """
+
+def alphabeta(state, alpha, beta, cancel=None):
+    """
+    Returns the minimax value of a Bitboard if it lies strictly between
+    alpha and beta. Otherwise returns a value at most alpha, or at least
+    beta, and the true value is no better for the player to move.
+    The Bitboard is left as it was found.
+
+    If cancel, a threading.Event, is set during the search,
+    raises Cancelled instead.
+    """
+    global nodes_visited
+    if use_symmetry:
+        key, symmetry = state.canonical()
+    else:
+        key, symmetry = state.key(), 0
+    hint = None
+    if key in transposition_table:
+        v, bound, move = transposition_table[key]
+        if (bound == EXACT
+                or bound == LOWER and v >= beta
+                or bound == UPPER and v <= alpha):
+            return v
+
+        # Otherwise the best move found before is still worth trying first
+        if move is not None:
+            hint = INVERSES[symmetry][move]
+
+    nodes_visited += 1
+    if cancel is not None and cancel.is_set():
+        raise Cancelled()
+    if state.terminal():
+        v = state.utility()
+        transposition_table[key] = (v, EXACT, None)
         return v
-    
-    best_action = None
-    if current_player == X:
-        best_value = -math.inf
-        for action in actions(board):
-            value = min_value(result(board, action))
-            if value > best_value:
-                best_value = value
-                best_action = action
+
+    original_alpha, original_beta = alpha, beta
+    maximizing = state.turn == X
+    v = -math.inf if maximizing else math.inf
+    best = None
+    moves = ordered_moves(state)
+    if hint is not None:
+        moves.remove(hint)
+        moves.insert(0, hint)
+    for i in moves:
+        state.move(i)
+        child = alphabeta(state, alpha, beta, cancel)
+        state.unmove(i)
+        if maximizing and child > v or not maximizing and child < v:
+            v = child
+            best = i
+        if maximizing:
+            alpha = max(alpha, v)
+        else:
+            beta = min(beta, v)
+        if alpha >= beta:
+
+            # Cutoffs higher in the tree save more, so count them for more
+            history[i] = history.get(i, 0) + len(moves) * len(moves)
+            break
+
+    if v <= original_alpha:
+        bound = UPPER
+    elif v >= original_beta:
+        bound = LOWER
     else:
-        best_value = math.inf
+        bound = EXACT
+    transposition_table[key] = (v, bound, SYMMETRIES[symmetry][best])
+    return v
+
+def value(board):
+    """
+    Returns the minimax value of the board: 1 if X wins with best play,
+    -1 if O does, 0 otherwise.
+    """
+    return alphabeta(Bitboard.from_board(board), -math.inf, math.inf)
+
+def load_book():
+    """
+    Returns the opening book, reading it on first use. If the book
+    file cannot be read, returns an empty book, so minimax searches.
+    """
+    global book
+    if book is None:
+        try:
+            book = read_book()
+        except OSError:
+            book = {}
+    return book
+
+def book_move(board, book):
+    """
+    Returns the action minimax would choose on the board, looked up in
+    a book rather than searched: the first action in actions order that
+    keeps the board's value. Returns None if a position is not in the book.
+    """
+    state = Bitboard.from_board(board)
+    try:
+        best = book[state.canonical()[0]][0]
         for action in actions(board):
-            value = max_value(result(board, action))
-            if value < best_value:
-                best_value = value
-                best_action = action
-    
-    return best_action
-    
+            state.move(index(action))
+            value = book[state.canonical()[0]][0]
+            state.unmove(index(action))
+            if value == best:
+                return action
+    except KeyError:
+        return None
+
+def search_move(board, cancel=None):
+    """
+    Returns the action minimax would choose on the board, by searching.
+    Raises Cancelled if cancel, a threading.Event, is set meanwhile.
+    """
+    # Find the best value with full pruning, then return the first action
+    # in actions order that achieves it, testing each with a null window
+    state = Bitboard.from_board(board)
+    best = alphabeta(state, -math.inf, math.inf, cancel)
+    for action in actions(board):
+        state.move(index(action))
+        if state.turn == O:
+            found = alphabeta(state, best - 1, best, cancel) >= best
+        else:
+            found = alphabeta(state, best, best + 1, cancel) <= best
+        state.unmove(index(action))
+        if found:
+            return action
+
+def minimax(board, cancel=None):
+    """
+    Returns the optimal action for the current player on the board.
+    If cancel, a threading.Event, is set before a search finishes,
+    raises Cancelled instead.
+    """
+    if terminal(board):
+        return None
+    action = book_move(board, load_book())
+    if action is None:
+        action = search_move(board, cancel)
+    return action
@@ -0,0 +1,86 @@
+"""
+Background search for the Tic Tac Toe window
+"""
+
+import threading
+import time
+
+import tictactoe as ttt
+
+class Search():
+    """
+    Runs minimax on a worker thread, so the window keeps rendering
+    while the computer thinks. Setting the cancellation token stops
+    the search early, and its result is discarded. An error in the
+    search is kept and raised again by move().
+    """
+
+    def __init__(self, board, thinking_time=0.5, minimax=ttt.minimax):
+        self.board = board
+        self.thinking_time = thinking_time
+        self.minimax = minimax
+        self.action = None
+        self.error = None
+        self.started = time.time()
+        self.cancel = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            self.action = self.minimax(self.board, self.cancel)
+        except ttt.Cancelled:
+            pass
+        except Exception as error:
+            self.error = error
+
+    def ready(self):
+        """
+        Returns True once the search has finished, with a move or an
+        error, and the computer has appeared to think for long enough.
+        """
+        return (not self.thread.is_alive() and not self.cancel.is_set()
+                and time.time() - self.started >= self.thinking_time)
+
+    def move(self):
+        """
+        Returns the move the search found, once ready. Raises the
+        search's error if it failed, or an Exception if it found no move.
+        """
+        if self.error is not None:
+            raise self.error
+        if self.action is None:
+            raise Exception(f"search found no move on {self.board}")
+        return self.action
+
+def main():
+    """
+    Checks, without a window, that a finished search hands over its
+    move, and that a failed one raises its error rather than a move.
+    """
+    search = Search(ttt.initial_state(), thinking_time=0)
+    search.thread.join()
+    assert search.ready()
+    print(f"Search found {search.move()} on the empty board.")
+
+    def failing(board, cancel):
+        raise ValueError("search failed")
+
+    search = Search(ttt.initial_state(), thinking_time=0, minimax=failing)
+    search.thread.join()
+    assert search.ready()
+    try:
+        search.move()
+    except ValueError as error:
+        print(f"Failed search raised {error!r} instead of a move.")
+    else:
+        raise Exception("failed search returned a move")
+
+    search = Search(ttt.initial_state(), thinking_time=0)
+    search.cancel.set()
+    search.thread.join()
+    assert not search.ready()
+    print("Cancelled search never became ready.")
+
+if __name__ == "__main__":
+    main()
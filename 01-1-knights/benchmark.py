@@ -0,0 +1,144 @@
+import argparse
+import csv
+import random
+import time
+import tracemalloc
+
+import logic
+import sat
+from generate import generate
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+from vector import Program
+
+# Columns of the results file
+FIELDS = ["backend", "characters", "statements", "symbols", "entailed",
+          "seconds", "peak_bytes", "models", "decisions", "conflicts"]
+
+
+def random_sentence(symbols, depth, rng):
+    """Returns a random sentence over symbols, at most depth deep."""
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(symbols)
+    kind = rng.choice([Not, And, Or, Implication, Biconditional])
+    if kind is Not:
+        return Not(random_sentence(symbols, depth - 1, rng))
+    if kind in (And, Or):
+        return kind(*[random_sentence(symbols, depth - 1, rng)
+                      for _ in range(rng.randint(1, 3))])
+    return kind(random_sentence(symbols, depth - 1, rng),
+                random_sentence(symbols, depth - 1, rng))
+
+
+def cross_check(trials, seed=None):
+    """
+    Checks the truth tables of compiled random sentences against
+    evaluate in every model. Raises an Exception if any differ.
+    """
+    rng = random.Random(seed)
+    for _ in range(trials):
+        names = [f"P{i}" for i in range(rng.randint(1, 8))]
+        symbols = [Symbol(name) for name in names]
+        sentence = random_sentence(symbols, 4, rng)
+        table = Program([sentence], names).truth_table()
+        for m in range(2 ** len(names)):
+            model = {name: bool(m >> i & 1) for i, name in enumerate(names)}
+            if table[m] != sentence.evaluate(model):
+                raise Exception(f"{sentence.formula()} differs in {model}")
+
+
+def solve(knowledge, symbols, backend):
+    """
+    Returns the symbols knowledge entails, checked with the given
+    backend, and the seconds it took.
+    """
+    logic.backend = backend
+
+    # Start from nothing the SAT backend kept from earlier queries
+    sat.cached = (None, None, None)
+    start = time.perf_counter()
+    entailed = [s for s in symbols if logic.model_check(knowledge, s)]
+    return entailed, time.perf_counter() - start
+
+
+def measure(knowledge, symbols, backend, memory=True):
+    """
+    Returns the symbols knowledge entails, checked with the given
+    backend, and a row of results: the seconds it took, the work
+    model_check counted, and, if memory, the peak bytes allocated,
+    measured in a second run since tracing slows the first.
+    """
+    logic.counts.update(models=0, decisions=0, conflicts=0)
+    entailed, seconds = solve(knowledge, symbols, backend)
+    row = dict(logic.counts, backend=backend, symbols=len(symbols),
+               entailed=len(entailed), seconds=f"{seconds:.6f}")
+    if memory:
+        tracemalloc.start()
+        solve(knowledge, symbols, backend)
+        row["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return entailed, row
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time model_check backends on generated puzzles "
+                    "of growing size, writing the results to a CSV file."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[2, 4, 6, 8, 10, 12, 25, 50, 100, 200, 400],
+                        help="characters in each puzzle")
+    parser.add_argument("--statements", type=float, default=1.0,
+                        help="statements per character")
+    parser.add_argument("--backends", nargs="+",
+                        default=["enumerate", "parallel", "numpy", "sat"])
+    parser.add_argument("--max-enumerate", type=int, default=16,
+                        help="most symbols to check by enumeration")
+    parser.add_argument("--max-parallel", type=int, default=16,
+                        help="most symbols to check with a process pool")
+    parser.add_argument("--max-numpy", type=int, default=24,
+                        help="most symbols to check with bit-vectors")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip measuring peak memory")
+    parser.add_argument("--output", default="benchmark.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if "numpy" in args.backends:
+        cross_check(1000, args.seed)
+        print("Compiled truth tables agree with evaluate.")
+
+    limits = {"enumerate": args.max_enumerate,
+              "parallel": args.max_parallel, "numpy": args.max_numpy}
+    with open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        print(f"{'backend':<10}{'characters':>11}{'statements':>11}"
+              f"{'entailed':>9}{'seconds':>10}{'peak KiB':>10}"
+              f"{'models':>12}{'decisions':>10}")
+        for characters in args.sizes:
+            statements = round(characters * args.statements)
+            knowledge, symbols, _, _ = generate(
+                characters, statements, args.seed
+            )
+            answers = {}
+            for backend in args.backends:
+                if len(symbols) > limits.get(backend, len(symbols)):
+                    continue
+                entailed, row = measure(knowledge, symbols, backend,
+                                        not args.no_memory)
+                answers[backend] = entailed
+                row.update(characters=characters, statements=statements)
+                writer.writerow(row)
+                peak = row.get("peak_bytes")
+                print(f"{backend:<10}{characters:>11}{statements:>11}"
+                      f"{len(entailed):>9}{float(row['seconds']):>10.3f}"
+                      f"{'-' if peak is None else peak // 1024:>10}"
+                      f"{row['models']:>12}{row['decisions']:>10}")
+            if len({tuple(entailed) for entailed in answers.values()}) > 1:
+                raise Exception(f"backends disagree on {characters} "
+                                f"characters: {answers}")
+    print(f"Wrote {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import random
+import string
+
+import logic
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def name(i):
+    """Returns the name of character i: A to Z, then AA, AB and so on."""
+    letters = ""
+    i += 1
+    while i:
+        i, letter = divmod(i - 1, 26)
+        letters = string.ascii_uppercase[letter] + letters
+    return letters
+
+
+def claims(knights, knaves, speaker, a, b):
+    """
+    Returns the (sentence, text) pairs a speaker can claim about
+    characters a and b, where character i is a knight if knights[i]
+    and a knave if knaves[i].
+    """
+    def who(i):
+        return "I" if i == speaker else name(i)
+
+    return [
+        (knights[a], f"{who(a)} {'am' if a == speaker else 'is'} a knight."),
+        (knaves[a], f"{who(a)} {'am' if a == speaker else 'is'} a knave."),
+        (Biconditional(knights[a], knights[b]),
+         f"{who(a)} and {who(b)} are the same kind."),
+        (Not(Biconditional(knights[a], knights[b])),
+         f"{who(a)} and {who(b)} are different kinds."),
+        (Or(knaves[a], knaves[b]),
+         f"At least one of {who(a)} and {who(b)} is a knave."),
+        (And(knights[a], knaves[b]),
+         f"{who(a)} is a knight and {who(b)} is a knave.")
+    ]
+
+
+def generate(characters, statements, seed=None):
+    """
+    Returns a random knights and knaves puzzle with the given numbers
+    of characters and statements, as a knowledge base, a list of its
+    symbols, a list of (speaker, text) statements, and the hidden
+    solution: a model in which the knowledge base is true.
+
+    Knights only say true things and knaves only false ones, so each
+    statement is drawn at random and then said by a character it is
+    true of in the solution, if a knight, or false of, if a knave.
+    """
+    rng = random.Random(seed)
+    knights = [Symbol(f"{name(i)} is a Knight") for i in range(characters)]
+    knaves = [Symbol(f"{name(i)} is a Knave") for i in range(characters)]
+    solution = {}
+    for knight, knave in zip(knights, knaves):
+        solution[knight.name] = rng.random() < 0.5
+        solution[knave.name] = not solution[knight.name]
+
+    conjuncts = []
+    for knight, knave in zip(knights, knaves):
+        conjuncts.append(Or(knight, knave))
+        conjuncts.append(Not(And(knight, knave)))
+
+    said = []
+    for _ in range(statements):
+        speaker = rng.randrange(characters)
+        a, b = rng.randrange(characters), rng.randrange(characters)
+        while characters > 1 and b == a:
+            b = rng.randrange(characters)
+
+        # Claiming a is a knight and claiming a is a knave can't both be
+        # true or both false, so there is always something to say
+        options = [(sentence, text) for sentence, text
+                   in claims(knights, knaves, speaker, a, b)
+                   if sentence.evaluate(solution)
+                   == solution[knights[speaker].name]]
+        sentence, text = rng.choice(options)
+        conjuncts.append(Implication(knights[speaker], sentence))
+        conjuncts.append(Implication(knaves[speaker], Not(sentence)))
+        said.append((name(speaker), text))
+
+    return And(*conjuncts), knights + knaves, said, solution
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a random knights and knaves puzzle."
+    )
+    parser.add_argument("characters", type=int)
+    parser.add_argument("statements", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    knowledge, symbols, said, _ = generate(
+        args.characters, args.statements, args.seed
+    )
+    for speaker, text in said:
+        print(f'{speaker} says "{text}"')
+    print("Entailed:")
+    logic.backend = "sat"
+    for symbol in symbols:
+        if logic.model_check(knowledge, symbol):
+            print(f"    {symbol}")
+
+
+if __name__ == "__main__":
+    main()
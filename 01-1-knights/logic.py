@@ -1,7 +1,53 @@
 import itertools
+import weakref
 
 
 class Sentence():
+    """
+    A logical sentence. Sentences are immutable and interned: building
+    one equal to a sentence that already exists returns that sentence,
+    so identical subformulas are shared, and equality and hashing are
+    by identity.
+    """
+
+    __slots__ = ("__weakref__",)
+
+    # Every sentence in use, by class and fields
+    interned = weakref.WeakValueDictionary()
+
+    # Names of the fields each kind of sentence stores
+    fields = ()
+
+    def __new__(cls, *args):
+        values = cls.arrange(*args)
+        key = (cls,) + values
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for field, value in zip(cls.fields, values):
+                object.__setattr__(sentence, field, value)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    @classmethod
+    def arrange(cls, *args):
+        """Returns the values of the fields of a sentence built from args."""
+        if len(args) != len(cls.fields):
+            raise TypeError(f"{cls.__name__} takes {len(cls.fields)} "
+                            f"arguments but {len(args)} were given")
+        for arg in args:
+            Sentence.validate(arg)
+        return args
+
+    def arguments(self):
+        """Returns the arguments that build this sentence."""
+        return tuple(getattr(self, field) for field in self.fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __reduce__(self):
+        return (type(self), self.arguments())
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -43,15 +89,11 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = fields = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    @classmethod
+    def arrange(cls, name):
+        return (name,)
 
     def __repr__(self):
         return self.name
@@ -70,15 +112,7 @@ class Symbol(Sentence):
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
-
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __slots__ = fields = ("operand",)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -94,18 +128,16 @@ class Not(Sentence):
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = fields = ("conjuncts",)
+
+    @classmethod
+    def arrange(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        return (conjuncts,)
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def arguments(self):
+        return self.conjuncts
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +146,13 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """
+        Sentences are immutable, so a conjunction cannot grow in place.
+        Raises TypeError rather than silently dropping the conjunct.
+        """
+        raise TypeError("sentences are immutable: build "
+                        "And(*knowledge.conjuncts, conjunct) instead, "
+                        "or add to a KnowledgeBase")
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -131,18 +168,16 @@ class And(Sentence):
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = fields = ("disjuncts",)
+
+    @classmethod
+    def arrange(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return (disjuncts,)
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def arguments(self):
+        return self.disjuncts
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -162,19 +197,7 @@ class Or(Sentence):
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __slots__ = fields = ("antecedent", "consequent")
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -193,19 +216,7 @@ class Implication(Sentence):
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __slots__ = fields = ("left", "right")
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -225,14 +236,44 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
+# How model_check decides entailment: "enumerate" checks every model,
+# "parallel" checks every model in a pool of processes with parallel.py,
+# "numpy" checks every model with the bit-vectors of vector.py, and
+# "sat" asks the SAT solver in sat.py for a counter-model
+backend = "enumerate"
+
+# Work model_check has done, for benchmarks: the models it evaluated the
+# knowledge base in, and the decisions and conflicts of the SAT solver
+counts = {"models": 0, "decisions": 0, "conflicts": 0}
+
+
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
+    # These build on the sentences here, so import them when first needed
+    if backend == "parallel":
+        from parallel import entails
+        return entails(knowledge, query)
+    if backend == "numpy":
+        from vector import entails
+        return entails(knowledge, query)
+    if backend == "sat":
+        from sat import entails
+        return entails(knowledge, query)
+    if backend != "enumerate":
+        raise ValueError(f"unknown backend {backend!r}")
+    return enumerate_models(knowledge, query)
+
+
+def enumerate_models(knowledge, query):
+    """Checks if knowledge base entails query, by checking every model."""
+
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
         # If model has an assignment for each symbol
         if not symbols:
+            counts["models"] += 1
 
             # If knowledge base is true in model, then query must also be true
             if knowledge.evaluate(model):
@@ -261,3 +302,70 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class KnowledgeBase():
+    """
+    A knowledge base that grows one sentence at a time, keeping its
+    symbols and the models that satisfy it, so a batch of queries is
+    answered with one pass over those models rather than a fresh
+    enumeration of every model per query.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.symbols = set()
+
+        # Symbols the satisfying models assign, and the models themselves
+        self.assigned = None
+        self.models = []
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        symbols = sentence.symbols()
+        self.symbols |= symbols
+
+        # Models over symbols the sentence lies within only need filtering
+        if self.assigned is not None and symbols <= self.assigned:
+            self.models = [model for model in self.models
+                           if sentence.evaluate(model)]
+        else:
+            self.assigned = None
+            self.models = []
+
+    def satisfying_models(self, symbols):
+        """
+        Returns every model over symbols, which must include the
+        knowledge base's own, in which the knowledge base is true.
+        """
+        if self.assigned != symbols:
+            names = sorted(symbols)
+            self.models = []
+            for values in itertools.product([True, False], repeat=len(names)):
+                model = dict(zip(names, values))
+                if all(sentence.evaluate(model)
+                       for sentence in self.sentences):
+                    self.models.append(model)
+            self.assigned = set(symbols)
+        return self.models
+
+    def ask(self, queries):
+        """Returns whether the knowledge base entails each of queries."""
+        symbols = set(self.symbols)
+        for query in queries:
+            symbols |= query.symbols()
+
+        # Keep models over more symbols than needed, rather than enumerate
+        if self.assigned is not None and symbols <= self.assigned:
+            symbols = self.assigned
+        models = self.satisfying_models(symbols)
+        return [all(query.evaluate(model) for model in models)
+                for query in queries]
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        return self.ask([query])[0]
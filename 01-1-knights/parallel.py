@@ -0,0 +1,131 @@
+import atexit
+import itertools
+import math
+import multiprocessing
+import os
+import pickle
+
+from logic import counts, enumerate_models
+
+# Models a worker checks between looks at whether the check it is
+# working on was settled elsewhere
+CHECK_INTERVAL = 4096
+
+# Cubes per worker, so a worker that finishes early has more to take
+CUBES_PER_WORKER = 4
+
+# Fewest models worth handing to the pool; smaller checks are quicker
+# to enumerate here than to send to the workers
+MINIMUM_MODELS = 2 ** 16
+
+# Pool kept alive between checks, its number of workers, the number of
+# the latest check, and the shared number of the latest check settled
+pool = None
+pool_workers = 0
+check = 0
+settled = None
+
+# Number of the check whose sentences a worker has loaded, and the
+# knowledge base, query, symbols and number of symbols split on
+loaded = None
+knowledge = None
+query = None
+symbols = None
+split = 0
+
+
+def init_worker(shared):
+    """
+    Stores the number of the latest settled check in a worker process.
+    """
+    global settled
+    settled = shared
+
+
+def check_cube(task):
+    """
+    Checks the models whose first split symbols are set by the bits of
+    a cube, given a task of the check's number, its pickled sentences
+    and symbols, and the cube. Returns whether the knowledge base entails
+    the query in all of them, or None if the check was settled first,
+    and the number of models checked.
+    """
+    global loaded, knowledge, query, symbols, split
+    number, payload, cube = task
+    if loaded != number:
+        knowledge, query, symbols, split = pickle.loads(payload)
+        loaded = number
+
+    model = {name: bool(cube >> i & 1) for i, name in enumerate(symbols[:split])}
+    rest = symbols[split:]
+    checked = 0
+    for values in itertools.product([True, False], repeat=len(rest)):
+        if checked % CHECK_INTERVAL == 0 and settled.value >= number:
+            return None, checked
+        model.update(zip(rest, values))
+        checked += 1
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            with settled.get_lock():
+                settled.value = max(settled.value, number)
+            return False, checked
+    return True, checked
+
+
+def get_pool(workers):
+    """
+    Returns a pool of the given number of workers, started on first use
+    and kept for later checks.
+    """
+    global pool, pool_workers, settled
+    if pool is None or pool_workers != workers:
+        if pool is not None:
+            pool.terminate()
+        settled = multiprocessing.Value("q", check)
+        pool = multiprocessing.Pool(workers, initializer=init_worker,
+                                    initargs=(settled,))
+        pool_workers = workers
+    return pool
+
+
+@atexit.register
+def close_pool():
+    if pool is not None:
+        pool.terminate()
+
+
+def entails(knowledge, query, workers=None, split=None):
+    """
+    Checks if knowledge base entails query by checking every model,
+    split into cubes on the assignments of the first split symbols and
+    checked by a pool of worker processes. Stops every worker once one
+    finds a model where knowledge is true and query is false.
+
+    Checks of fewer than MINIMUM_MODELS models enumerate them here.
+    """
+    global check
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if 2 ** len(names) < MINIMUM_MODELS:
+        return enumerate_models(knowledge, query)
+
+    workers = workers or os.cpu_count()
+    if split is None:
+        split = math.ceil(math.log2(workers * CUBES_PER_WORKER))
+    split = min(split, len(names))
+
+    # Workers unpickle the sentences once per check, not once per cube
+    pool = get_pool(workers)
+    check += 1
+    number = check
+    payload = pickle.dumps((knowledge, query, names, split))
+    tasks = [(number, payload, cube) for cube in range(2 ** split)]
+    try:
+        for entailed, checked in pool.imap_unordered(check_cube, tasks):
+            counts["models"] += checked
+            if entailed is False:
+                return False
+    finally:
+
+        # Stop workers still on this check's cubes
+        with settled.get_lock():
+            settled.value = max(settled.value, number)
+    return True
@@ -0,0 +1,377 @@
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, counts
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form, built from sentences by the
+    Tseitin transformation. Variables are numbered from 1, and a
+    literal is a variable or its negation.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.clauses = []
+        self.count = 0
+
+        # Literal for each subformula already encoded, by identity
+        self.encoded = {}
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def symbol(self, name):
+        """Returns the variable of the symbol with the given name."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def assert_sentence(self, sentence):
+        """Adds clauses requiring sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.assert_sentence(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to sentence, adding clauses
+        defining a fresh variable for each compound subformula.
+        """
+        key = id(sentence)
+        if key in self.encoded:
+            return self.encoded[key][0]
+
+        if isinstance(sentence, Symbol):
+            v = self.symbol(sentence.name)
+        elif isinstance(sentence, Not):
+            v = -self.literal(sentence.operand)
+        elif isinstance(sentence, (And, Or)):
+            operands = (sentence.conjuncts if isinstance(sentence, And)
+                        else sentence.disjuncts)
+            literals = [self.literal(operand) for operand in operands]
+            v = self.new_variable()
+
+            # v <=> all of literals, or v <=> any of them: the same clauses
+            # with every literal negated
+            sign = 1 if isinstance(sentence, And) else -1
+            for literal in literals:
+                self.clauses.append([-sign * v, sign * literal])
+            self.clauses.append([sign * v] + [-sign * l for l in literals])
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses.extend(
+                [[-v, -a, b], [-v, a, -b], [v, a, b], [v, -a, -b]]
+            )
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+
+        # Keep the sentence alive, so its id cannot be reused
+        self.encoded[key] = (v, sentence)
+        return v
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver.
+
+    Each clause watches two of its literals, and is only visited when
+    one of them becomes false, to find another to watch or else imply
+    the other. Conflicts are analyzed back to their first unique
+    implication point, and the learned clause decides how far to jump
+    back. Decisions follow variable activity, bumped for variables
+    that take part in conflicts.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.clauses = []
+        self.watches = {}
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.phases = [False]
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.unsatisfiable = False
+
+        self.activity = [0.0]
+        self.increment = 1.0
+        self.order = []
+
+        self.decisions = 0
+        self.conflicts = 0
+        self.propagations = 0
+
+    def grow(self, count):
+        """Makes room for variables up to count."""
+        for v in range(self.count + 1, count + 1):
+            self.values.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.phases.append(False)
+            self.activity.append(0.0)
+            heapq.heappush(self.order, (0.0, v))
+        self.count = max(self.count, count)
+
+    def value(self, literal):
+        """Returns the truth value of a literal, or None if unassigned."""
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause of literals, between calls to solve. Literals already
+        false are left out, and clauses already true are skipped.
+        """
+        self.backtrack(0)
+        literals = list(dict.fromkeys(literals))
+        if any(-literal in literals or self.value(literal)
+               for literal in literals):
+            return
+        literals = [l for l in literals if self.value(l) is None]
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+        else:
+            self.watch(literals)
+
+    def watch(self, literals):
+        """Stores a clause, watching its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(literals)
+        for literal in literals[:2]:
+            self.watches.setdefault(literal, []).append(index)
+        return index
+
+    def assign(self, literal, reason):
+        v = abs(literal)
+        self.values[v] = literal > 0
+        self.levels[v] = len(self.limits)
+        self.reasons[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses, returning
+        the index of a clause left false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            watching = self.watches.get(false, [])
+            self.watches[false] = kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[position + 1:])
+                        return index
+                    self.assign(clause[0], index)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict, with the literal it
+        asserts first, and the decision level to jump back to.
+        """
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in clause if literal is None else clause[1:]:
+                v = abs(q)
+                if v not in seen and self.levels[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.levels[v] == level:
+                        pending += 1
+                    else:
+                        learned.append(q)
+
+            # Walk back along the trail to the next literal to resolve on
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal from the deepest other level second
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[u], u) for u in range(1, self.count + 1)]
+            heapq.heapify(self.order)
+        heapq.heappush(self.order, (-self.activity[v], v))
+
+    def backtrack(self, level):
+        """Unassigns every literal above a decision level."""
+        if len(self.limits) <= level:
+            return
+        for literal in self.trail[self.limits[level]:]:
+            v = abs(literal)
+            self.phases[v] = self.values[v]
+            self.values[v] = None
+            self.reasons[v] = None
+            heapq.heappush(self.order, (-self.activity[v], v))
+        del self.trail[self.limits[level]:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the most active unassigned variable, or None."""
+        while self.order:
+            _, v = heapq.heappop(self.order)
+            if self.values[v] is None:
+                return v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal of
+        assumptions true, otherwise False. Assumptions are made as the
+        first decisions, so clauses learned under them hold without them,
+        and the solver can be asked again with different assumptions.
+        """
+        self.backtrack(0)
+        if self.unsatisfiable:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.limits:
+                    self.unsatisfiable = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.watch(learned))
+                self.increment /= 0.95
+            elif len(self.limits) < len(assumptions):
+                literal = assumptions[len(self.limits)]
+                if self.value(literal) is False:
+                    return False
+
+                # Open a level even if it is already true, so the level
+                # of each assumption matches its place in the list
+                self.limits.append(len(self.trail))
+                if self.value(literal) is None:
+                    self.assign(literal, None)
+            else:
+                v = self.decide()
+                if v is None:
+                    return True
+                self.decisions += 1
+                self.limits.append(len(self.trail))
+                self.assign(v if self.phases[v] else -v, None)
+
+    def model(self, variables):
+        """Returns the truth value of each named variable after solving."""
+        return {name: bool(self.values[v]) for name, v in variables.items()}
+
+
+class Prover():
+    """
+    Decides what a growing knowledge base entails with one solver, so
+    the knowledge is encoded once and what the solver learns answering
+    one query speeds up the next.
+    """
+
+    def __init__(self):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.added = 0
+
+    def flush(self):
+        """Passes the solver any clauses encoded since the last call."""
+        self.solver.grow(self.cnf.count)
+        for clause in self.cnf.clauses[self.added:]:
+            self.solver.add_clause(clause)
+        self.added = len(self.cnf.clauses)
+
+    def add(self, sentence):
+        """Adds sentence to the knowledge base."""
+        self.cnf.assert_sentence(sentence)
+        self.flush()
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        literal = self.cnf.literal(query)
+        self.flush()
+        decisions, conflicts = self.solver.decisions, self.solver.conflicts
+        satisfiable = self.solver.solve([-literal])
+        counts["decisions"] += self.solver.decisions - decisions
+        counts["conflicts"] += self.solver.conflicts - conflicts
+        return not satisfiable
+
+
+# Prover of the last knowledge base given to entails, and its key
+cached = (None, None, None)
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by asking a SAT solver
+    whether knowledge and not query can be true together.
+
+    Consecutive queries of the same, unchanged knowledge base reuse
+    its encoding and whatever the solver learned from earlier ones.
+    """
+    global cached
+    key = (id(knowledge), hash(knowledge))
+    if cached[0] != key:
+
+        # Keep the knowledge base itself, so its id is not reused
+        prover = Prover()
+        prover.add(knowledge)
+        cached = (key, prover, knowledge)
+    return cached[1].entails(query)
@@ -0,0 +1,176 @@
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, counts
+
+# Models are evaluated 2 ** CHUNK_BITS at a time, one bit each
+CHUNK_BITS = 20
+
+ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Bit b of each word holds the model whose symbol i < 6 is bit i of b
+WORD_PATTERNS = [
+    np.uint64(0xAAAAAAAAAAAAAAAA),
+    np.uint64(0xCCCCCCCCCCCCCCCC),
+    np.uint64(0xF0F0F0F0F0F0F0F0),
+    np.uint64(0xFF00FF00FF00FF00),
+    np.uint64(0xFFFF0000FFFF0000),
+    np.uint64(0xFFFFFFFF00000000)
+]
+
+
+class Program():
+    """
+    Sentences compiled to a sequence of NumPy bitwise operations over
+    packed bit-vectors, one bit per model, so each operation evaluates
+    a whole chunk of models at once.
+
+    Model m sets symbol symbols[i] true if bit i of m is set, and is
+    bit m % 64 of word m // 64 of the vectors of its chunk.
+    """
+
+    def __init__(self, sentences, symbols):
+        self.symbols = list(symbols)
+        self.index = {name: i for i, name in enumerate(self.symbols)}
+        self.count = 2 ** len(self.symbols)
+        self.chunk_bits = min(len(self.symbols), CHUNK_BITS)
+        self.chunks = 2 ** (len(self.symbols) - self.chunk_bits)
+        self.words = max(1, 2 ** self.chunk_bits // 64)
+
+        # Each step is an operation and the registers of its operands,
+        # and writes the next register; shared subformulas compile once
+        self.steps = []
+        self.registers = {}
+        self.outputs = [self.compile(sentence) for sentence in sentences]
+
+        # Registers no later step reads, to free after each step, so a
+        # chunk only holds the vectors still needed rather than one per step
+        last_use = {register: register for register in range(len(self.steps))}
+        for position, step in enumerate(self.steps):
+            if step[0] != "symbol":
+                for register in step[1:]:
+                    last_use[register] = position
+        self.released = [[] for _ in self.steps]
+        for register, position in last_use.items():
+            if register not in self.outputs:
+                self.released[position].append(register)
+
+    def compile(self, sentence):
+        """Adds steps computing sentence, returning its register."""
+        if id(sentence) in self.registers:
+            return self.registers[id(sentence)][0]
+
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.index:
+                raise Exception(f"variable {sentence.name} not in model")
+            step = ("symbol", self.index[sentence.name])
+        elif isinstance(sentence, Not):
+            step = ("not", self.compile(sentence.operand))
+        elif isinstance(sentence, (And, Or)):
+
+            # Fold each operand in as soon as it is computed, so a wide
+            # conjunction holds two vectors at a time rather than all of them
+            op = "and" if isinstance(sentence, And) else "or"
+            operands = (sentence.conjuncts if op == "and"
+                        else sentence.disjuncts)
+            register = None
+            for operand in operands:
+                value = self.compile(operand)
+                register = (value if register is None
+                            else self.emit((op, register, value)))
+            if register is None:
+                register = self.emit((op,))
+            return self.remember(sentence, register)
+        elif isinstance(sentence, Implication):
+            step = ("implies", self.compile(sentence.antecedent),
+                    self.compile(sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            step = ("iff", self.compile(sentence.left),
+                    self.compile(sentence.right))
+        else:
+            raise TypeError(f"cannot compile {sentence!r}")
+
+        return self.remember(sentence, self.emit(step))
+
+    def emit(self, step):
+        """Adds a step, returning the register it writes."""
+        self.steps.append(step)
+        return len(self.steps) - 1
+
+    def remember(self, sentence, register):
+        """Records the register holding sentence, and returns it."""
+
+        # Keep the sentence alive, so its id cannot be reused
+        self.registers[id(sentence)] = (register, sentence)
+        return register
+
+    def symbol(self, i, chunk):
+        """Returns the vector of symbol i over the models of a chunk."""
+        if i < 6:
+            return np.full(self.words, WORD_PATTERNS[i])
+        if i < self.chunk_bits:
+            words = np.arange(self.words) >> (i - 6) & 1
+            return np.where(words == 1, ONES, np.uint64(0))
+        return np.full(self.words, ONES if chunk >> (i - self.chunk_bits) & 1
+                       else np.uint64(0))
+
+    def run(self, chunk):
+        """
+        Returns the vector of each compiled sentence over the models
+        of a chunk. Bits past the last model are cleared.
+        """
+        registers = [None] * len(self.steps)
+        for position, step in enumerate(self.steps):
+            op, args = step[0], step[1:]
+            if op == "symbol":
+                value = self.symbol(args[0], chunk)
+            elif op == "not":
+                value = ~registers[args[0]]
+            elif op == "and":
+                value = np.full(self.words, ONES)
+                for arg in args:
+                    value = value & registers[arg]
+            elif op == "or":
+                value = np.zeros(self.words, dtype=np.uint64)
+                for arg in args:
+                    value = value | registers[arg]
+            elif op == "implies":
+                value = ~registers[args[0]] | registers[args[1]]
+            else:
+                value = ~(registers[args[0]] ^ registers[args[1]])
+            registers[position] = value
+            for register in self.released[position]:
+                registers[register] = None
+
+        outputs = [registers[register] for register in self.outputs]
+        if self.count < 64:
+            mask = np.uint64((1 << self.count) - 1)
+            outputs = [output & mask for output in outputs]
+        return outputs
+
+    def truth_table(self, sentence=0):
+        """
+        Returns a boolean array of the value of the compiled sentence
+        with the given position in every model, in model order.
+        """
+        table = np.concatenate([
+            np.unpackbits(self.run(chunk)[sentence].astype("<u8")
+                          .view(np.uint8), bitorder="little")
+            for chunk in range(self.chunks)
+        ])
+        return table[:self.count].astype(bool)
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, evaluating every model a
+    chunk at a time and stopping at the first chunk with a model where
+    knowledge is true and query is false.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    program = Program([knowledge, query], symbols)
+    for chunk in range(program.chunks):
+        kb, result = program.run(chunk)
+        counts["models"] += min(program.count, 2 ** program.chunk_bits)
+        if np.any(kb & ~result):
+            return False
+    return True
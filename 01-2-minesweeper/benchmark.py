@@ -0,0 +1,112 @@
+"""
+Minesweeper inference benchmark
+"""
+
+import argparse
+import random
+import time
+
+import baseline
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines, seed=None):
+    """
+    Plays a game to the end, never choosing a mine at random, so every
+    safe cell is revealed. Returns the number of moves, the seconds
+    spent in add_knowledge, and the AI.
+    """
+    random.seed(seed)
+    game = Minesweeper(height, width, mines)
+    ai = MinesweeperAI(height, width)
+    moves = 0
+    seconds = 0
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            choices = [
+                (i, j) for i in range(height) for j in range(width)
+                if (i, j) not in ai.moves_made and (i, j) not in ai.mines
+                and not game.is_mine((i, j))
+            ]
+            if not choices:
+                return moves, seconds, ai
+            move = random.choice(choices)
+        start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        seconds += time.perf_counter() - start
+        moves += 1
+
+
+def verify(games, seed=0):
+    """
+    Plays games on random boards of up to 12x12 and up to 40% mines,
+    feeding every move to the AI and to the original one in baseline.py.
+    Returns the number of moves checked. Raises an Exception as soon
+    as the two know different safes or mines.
+    """
+    checked = 0
+    for game_number in range(games):
+        rng = random.Random(seed + game_number)
+        height, width = rng.randint(2, 12), rng.randint(2, 12)
+        mines = rng.randint(1, max(1, height * width * 2 // 5))
+        random.seed(seed + game_number)
+        game = Minesweeper(height, width, mines)
+        ai = MinesweeperAI(height, width)
+        original = baseline.MinesweeperAI(height, width)
+        while True:
+
+            # Reveal a known safe cell, else any cell that is not a mine,
+            # so games run until the board is cleared
+            safes = sorted(original.safes - original.moves_made)
+            if not safes:
+                safes = [
+                    (i, j) for i in range(height) for j in range(width)
+                    if (i, j) not in original.moves_made
+                    and not game.is_mine((i, j))
+                ]
+            if not safes:
+                break
+            move = rng.choice(safes)
+            count = game.nearby_mines(move)
+            ai.add_knowledge(move, count)
+            original.add_knowledge(move, count)
+            checked += 1
+            if ai.safes != original.safes or ai.mines != original.mines:
+                raise Exception(
+                    f"game {game_number} ({height}x{width}, {mines} mines) "
+                    f"differs after revealing {move}: safes "
+                    f"{ai.safes ^ original.safes}, "
+                    f"mines {ai.mines ^ original.mines}"
+                )
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the AI's inference over a whole game."
+    )
+    parser.add_argument("--height", type=int, default=100)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--mines", type=int, default=1600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", type=int, metavar="GAMES",
+                        help="instead check the AI against the original "
+                             "one in baseline.py over this many games")
+    args = parser.parse_args()
+
+    if args.verify:
+        checked = verify(args.verify, args.seed)
+        print(f"Safes and mines agree with the original AI after all "
+              f"{checked} moves of {args.verify} games.")
+        return
+
+    moves, seconds, ai = play(args.height, args.width, args.mines, args.seed)
+    print(f"{args.height}x{args.width} board, {args.mines} mines: "
+          f"{moves} moves, {seconds:.2f}s in add_knowledge "
+          f"({seconds / moves * 1000:.2f}ms per move), "
+          f"{len(ai.mines)} mines found, {len(ai.knowledge)} sentences left.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import collections
 import itertools
 import random
 
@@ -89,50 +90,60 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+    Sentences are immutable and hashable, so the AI can keep them in sets.
     """
 
+    __slots__ = ("cells", "count")
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
-        self.count = count
+        object.__setattr__(self, "cells", frozenset(cells))
+        object.__setattr__(self, "count", count)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
-    
+        return f"{set(self.cells)} = {self.count}"
+
     def known_mines(self):
         """
         Returns a set of all cells in self.cells known to be mines.
         If the number of remaining cells equals the count, all must be mines.
         """
         if len(self.cells) == self.count:
-            return self.cells.copy()  # Return a copy to avoid modifying the original
+            return set(self.cells)
         return set()
- 
+
     def known_safes(self):
-    
+        """
+        Returns a set of all cells in self.cells known to be safe.
+        """
         if self.count == 0:
-            return self.cells.copy()
+            return set(self.cells)
         return set()
 
-
-
     def mark_mine(self, cell):
-    
+        """
+        Returns the sentence with cell removed, if it is known to be a mine,
+        and the count reduced to match.
+        """
         if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1  # Since one of the mines is confirmed
-
-
+            return Sentence(self.cells - {cell}, self.count - 1)
+        return self
 
     def mark_safe(self, cell):
         """
-        Removes a cell from the sentence if it is known to be safe.
+        Returns the sentence with cell removed, if it is known to be safe.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
-
+            return Sentence(self.cells - {cell}, self.count)
+        return self
 
 
 class MinesweeperAI():
@@ -153,26 +164,59 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Every cell, so each sentence shares the same cell tuples
+        self.cells = [[(i, j) for j in range(width)] for i in range(height)]
+
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+        # Sentences that mention each cell
+        self.containing = {}
+
+        # Sentences added or rewritten and not yet inferred from
+        self.queue = collections.deque()
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and queues it for
+        inference, unless it is empty or already known.
+        """
+        if not sentence.cells or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.containing.setdefault(cell, set()).add(sentence)
+        self.queue.append(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base.
+        """
+        self.knowledge.remove(sentence)
+        for cell in sentence.cells:
+            self.containing[cell].discard(sentence)
+            if not self.containing[cell]:
+                del self.containing[cell]
 
     def mark_mine(self, cell):
         """
-        Marks a cell as a mine, and updates all knowledge
-        to mark that cell as a mine as well.
+        Marks a cell as a mine, and rewrites the sentences
+        that mention it to mark it as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        for sentence in list(self.containing.get(cell, ())):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
-        Marks a cell as safe, and updates all knowledge
-        to mark that cell as safe as well.
+        Marks a cell as safe, and rewrites the sentences
+        that mention it to mark it as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        for sentence in list(self.containing.get(cell, ())):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_safe(cell))
 
     def get_neighbors(self, cell):
         """Returns a set of valid neighbor cells within the board."""
@@ -184,7 +228,7 @@ class MinesweeperAI():
                     continue
                 r, c = row + dr, col + dc
                 if 0 <= r < self.height and 0 <= c < self.width:
-                    neighbors.add((r, c))
+                    neighbors.add(self.cells[r][c])
         return neighbors - self.moves_made  # Exclude known moves
 
     def add_knowledge(self, cell, count):
@@ -196,48 +240,45 @@ class MinesweeperAI():
         self.mark_safe(cell)
 
         # Step 3: Add a new sentence to the knowledge base
-        neighbors = self.get_neighbors(cell)
-        if neighbors:
-            self.knowledge.append(Sentence(neighbors, count))
+        self.add_sentence(Sentence(self.get_neighbors(cell), count))
 
-        # Step 4 & 5: Process the knowledge base iteratively
-        while True:
-            prev_mines = self.mines.copy()
-            prev_safes = self.safes.copy()
-            prev_knowledge = self.knowledge.copy()
+        # Step 4 & 5: Draw conclusions from each sentence added or
+        # changed, until there are none left to look at
+        while self.queue:
+            sentence = self.queue.popleft()
+            if sentence not in self.knowledge:
+                continue  # Rewritten or removed since it was queued
 
             # Identify and mark obvious mines and safe cells
-            for sentence in self.knowledge[:]:  # Copy to avoid modifying during iteration
-                if sentence.count == 0:
-                    for safe in sentence.cells.copy():
-                        self.mark_safe(safe)
-                    self.knowledge.remove(sentence)
-                elif len(sentence.cells) == sentence.count:
-                    for mine in sentence.cells.copy():
-                        self.mark_mine(mine)
-                    self.knowledge.remove(sentence)
-
-            # Infer new sentences using subset relationships
-            new_sentences = []
-            for s1 in self.knowledge:
-                for s2 in self.knowledge:
-                    if s1 != s2 and s1.cells.issubset(s2.cells):
-                        remaining_cells = s2.cells - s1.cells
-                        remaining_count = s2.count - s1.count
-                        if remaining_cells and remaining_count >= 0:
-                            new_sentence = Sentence(remaining_cells, remaining_count)
-                            if new_sentence not in self.knowledge:
-                                new_sentences.append(new_sentence)
-
-            self.knowledge.extend(new_sentences)
-
-            # Remove empty sentences
-            self.knowledge = [s for s in self.knowledge if s.cells]
-
-            # Stop if no new information is found
-            if self.mines == prev_mines and self.safes == prev_safes and self.knowledge == prev_knowledge:
-                break
-                
+            if sentence.count == 0:
+                self.remove_sentence(sentence)
+                for safe in sentence.cells:
+                    self.mark_safe(safe)
+                continue
+            if len(sentence.cells) == sentence.count:
+                self.remove_sentence(sentence)
+                for mine in sentence.cells:
+                    self.mark_mine(mine)
+                continue
+
+            # Infer new sentences using subset relationships, which only
+            # sentences sharing a cell with this one can have
+            others = set()
+            for cell in sentence.cells:
+                others |= self.containing[cell]
+            others.discard(sentence)
+            for other in others:
+                if sentence.cells < other.cells:
+                    smaller, larger = sentence, other
+                elif other.cells < sentence.cells:
+                    smaller, larger = other, sentence
+                else:
+                    continue
+                remaining_count = larger.count - smaller.count
+                if remaining_count >= 0:
+                    self.add_sentence(Sentence(larger.cells - smaller.cells,
+                                               remaining_count))
+
     def make_safe_move(self):
     
         """